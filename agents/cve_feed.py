@@ -0,0 +1,113 @@
+# backend/agents/cve_feed.py
+
+import gzip
+import json
+from pathlib import Path
+from typing import Any, Iterator, TextIO
+
+GZIP_MAGIC = b"\x1f\x8b"
+READ_SIZE = 1 << 16
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\r\n"
+# raw_decode reports a cut-off literal or escape at its start; "-Infinity" is the longest
+_PARTIAL_TOKEN = len("-Infinity")
+_NUMBER_CHARS = frozenset("0123456789+-.eE")
+
+def open_feed(path) -> TextIO:
+    """Open a CVE feed as text, transparently decompressing gzip (detected by magic bytes)"""
+    path = Path(path)
+    with open(path, "rb") as f:
+        compressed = f.read(2) == GZIP_MAGIC
+    if compressed:
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+def iter_cve_records(path) -> Iterator[Any]:
+    """Yield CVE records one at a time from a JSON array, NDJSON or gzip-compressed feed.
+
+    Only the record being decoded and one read buffer are held in memory, so the
+    first record is available immediately however large the feed is.
+    """
+    with open_feed(path) as f:
+        reader = _BufferedRecords(f)
+        first = reader.peek()
+        if first == "[":
+            reader.pos += 1
+            yield from reader.array_items()
+        elif first:
+            yield from reader.concatenated_values()
+
+class _BufferedRecords:
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.read_size = READ_SIZE
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.stream.read(self.read_size)
+        if not chunk:
+            self.eof = True
+            return False
+        # Drop consumed text so the buffer stays about one record long
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self, skip: str = _WHITESPACE) -> str:
+        """Next character after skipping ``skip`` characters, or "" at end of input"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in skip:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def decode(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as e:
+                # Only a value cut off at the end of the buffer is worth reading more for
+                if not self._cut_off(e) or not self._fill():
+                    raise
+                # A record larger than the read size would otherwise be re-parsed once per chunk
+                self.read_size *= 2
+                continue
+            if (isinstance(value, (int, float)) and not self.eof
+                    and _NUMBER_CHARS.issuperset(self.buffer[end:]) and self._fill()):
+                # A bare number may continue in the next chunk ("-1" followed by ".25e-7")
+                continue
+            self.pos = end
+            self.read_size = READ_SIZE
+            return value
+
+    def _cut_off(self, error: json.JSONDecodeError) -> bool:
+        """Whether the decode error could go away with more input"""
+        if error.msg.startswith("Unterminated string"):
+            # Reported at the opening quote; the closing quote may be in the next chunk
+            return True
+        return len(self.buffer) - error.pos <= _PARTIAL_TOKEN
+
+    def array_items(self) -> Iterator[Any]:
+        if self.peek() == "]":
+            return
+        while True:
+            yield self.decode()
+            separator = self.peek()
+            if separator == "]":
+                return
+            if separator != ",":
+                raise ValueError(f"Malformed CVE feed: expected ',' or ']' but found {separator!r}")
+            self.pos += 1
+
+    def concatenated_values(self) -> Iterator[Any]:
+        # NDJSON is the common case, but any whitespace-separated sequence of JSON values works
+        while self.peek():
+            yield self.decode()
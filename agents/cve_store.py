@@ -0,0 +1,173 @@
+# backend/agents/cve_store.py
+
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+CVE_STORE_PATH = "backend/data/cve_store.sqlite3"
+
+def _as_list(value: Any) -> List[str]:
+    if not value:
+        return []
+    if isinstance(value, (list, tuple, set)):
+        return [str(item) for item in value if item]
+    return [str(value)]
+
+def _vendors(record: Dict) -> List[str]:
+    return _as_list(record.get("vendor")) + _as_list(record.get("vendors"))
+
+def _prefix_upper_bound(prefix: str) -> str:
+    # Every string starting with prefix sorts below prefix + U+10FFFF
+    return prefix + "\U0010ffff"
+
+class CVEStore:
+    """SQLite-backed CVE store with secondary indexes for the common questions.
+
+    Full records are kept as JSON. Severity and published date are indexed
+    columns. Affected software and vendors live in lower-cased side tables whose
+    primary keys make name-prefix lookups ("openssh" finds "OpenSSH 8.2") index
+    range scans. Filters combine with AND, and no query ever loads the full feed.
+    """
+
+    def __init__(self, db_path: str = CVE_STORE_PATH):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(
+                "CREATE TABLE IF NOT EXISTS cves ("
+                "  cve_id TEXT PRIMARY KEY, severity TEXT, published_date TEXT,"
+                "  record TEXT NOT NULL, updated_at REAL NOT NULL);"
+                "CREATE INDEX IF NOT EXISTS idx_cves_severity ON cves (severity, published_date);"
+                "CREATE INDEX IF NOT EXISTS idx_cves_published ON cves (published_date);"
+                "CREATE TABLE IF NOT EXISTS cve_software ("
+                "  software TEXT NOT NULL, cve_id TEXT NOT NULL, PRIMARY KEY (software, cve_id)) WITHOUT ROWID;"
+                "CREATE INDEX IF NOT EXISTS idx_cve_software_cve ON cve_software (cve_id);"
+                "CREATE TABLE IF NOT EXISTS cve_vendors ("
+                "  vendor TEXT NOT NULL, cve_id TEXT NOT NULL, PRIMARY KEY (vendor, cve_id)) WITHOUT ROWID;"
+                "CREATE INDEX IF NOT EXISTS idx_cve_vendors_cve ON cve_vendors (cve_id);"
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def upsert_many(self, records: Iterable[Dict], batch_size: int = 1000) -> int:
+        """Insert or replace CVE records in batches, one transaction per batch; returns the count"""
+        total = 0
+        for record in self.upsert_stream(records, batch_size):
+            if isinstance(record, dict) and record.get("id"):
+                total += 1
+        return total
+
+    def _write_batch(self, batch: List[Dict]):
+        now = time.time()
+        ids = [(r["id"],) for r in batch]
+        with self._connect() as conn:
+            conn.executemany("DELETE FROM cve_software WHERE cve_id = ?", ids)
+            conn.executemany("DELETE FROM cve_vendors WHERE cve_id = ?", ids)
+            conn.executemany(
+                "INSERT OR REPLACE INTO cves (cve_id, severity, published_date, record, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(r["id"], str(r.get("severity") or "").lower() or None, r.get("published_date"),
+                  json.dumps(r), now) for r in batch]
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO cve_software (software, cve_id) VALUES (?, ?)",
+                [(software.lower(), r["id"]) for r in batch for software in _as_list(r.get("affected_software"))]
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO cve_vendors (vendor, cve_id) VALUES (?, ?)",
+                [(vendor.lower(), r["id"]) for r in batch for vendor in _vendors(r)]
+            )
+
+    def upsert_stream(self, records: Iterable[Dict], batch_size: int = 1000) -> Iterator[Dict]:
+        """Pass records through unchanged while upserting them in batches as they go by"""
+        batch = []
+        for record in records:
+            if isinstance(record, dict) and record.get("id"):
+                batch.append(record)
+                if len(batch) >= batch_size:
+                    self._write_batch(batch)
+                    batch = []
+            yield record
+        if batch:
+            self._write_batch(batch)
+
+    def get(self, cve_id: str) -> Optional[Dict]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT record FROM cves WHERE cve_id = ?", (cve_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _where(self, severity: Union[str, List[str], None], software: Optional[str], vendor: Optional[str],
+               published_after: Optional[str], published_before: Optional[str]) -> Tuple[str, List]:
+        clauses, params = [], []
+        if severity:
+            levels = [s.lower() for s in _as_list(severity)]
+            clauses.append(f"c.severity IN ({','.join('?' * len(levels))})")
+            params.extend(levels)
+        if published_after:
+            clauses.append("c.published_date >= ?")
+            params.append(published_after)
+        if published_before:
+            clauses.append("c.published_date <= ?")
+            params.append(published_before)
+        if software:
+            prefix = software.lower()
+            clauses.append("c.cve_id IN (SELECT cve_id FROM cve_software WHERE software >= ? AND software < ?)")
+            params.extend([prefix, _prefix_upper_bound(prefix)])
+        if vendor:
+            clauses.append("c.cve_id IN (SELECT cve_id FROM cve_vendors WHERE vendor = ?)")
+            params.append(vendor.lower())
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query(self, severity: Union[str, List[str], None] = None, software: str = None, vendor: str = None,
+              published_after: str = None, published_before: str = None,
+              limit: int = 100, offset: int = 0) -> List[Dict]:
+        """CVE records matching every given filter, newest first.
+
+        ``software`` matches any affected product whose name starts with it,
+        case-insensitively. ``severity`` takes one level or a list of levels.
+        Dates compare as ISO strings.
+        """
+        where, params = self._where(severity, software, vendor, published_after, published_before)
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT c.record FROM cves c{where} "
+                f"ORDER BY c.published_date DESC, c.cve_id LIMIT ? OFFSET ?",
+                params + [limit, offset]
+            ).fetchall()
+        return [json.loads(record) for record, in rows]
+
+    def count(self, severity: Union[str, List[str], None] = None, software: str = None, vendor: str = None,
+              published_after: str = None, published_before: str = None) -> int:
+        where, params = self._where(severity, software, vendor, published_after, published_before)
+        with self._connect() as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM cves c{where}", params).fetchone()[0]
+
+    def iter_all(self, batch_size: int = 1000) -> Iterator[Dict]:
+        """Every stored record in CVE ID order, fetched a batch at a time"""
+        last_id = ""
+        while True:
+            with self._connect() as conn:
+                rows = conn.execute(
+                    "SELECT cve_id, record FROM cves WHERE cve_id > ? ORDER BY cve_id LIMIT ?", (last_id, batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            for cve_id, record in rows:
+                yield json.loads(record)
+            last_id = rows[-1][0]
+
+    def stats(self) -> Dict:
+        with self._connect() as conn:
+            by_severity = dict(conn.execute(
+                "SELECT COALESCE(severity, 'unknown'), COUNT(*) FROM cves GROUP BY severity"
+            ).fetchall())
+            return {
+                "total": sum(by_severity.values()),
+                "by_severity": by_severity,
+                "software_entries": conn.execute("SELECT COUNT(*) FROM cve_software").fetchone()[0],
+                "vendor_entries": conn.execute("SELECT COUNT(*) FROM cve_vendors").fetchone()[0],
+                "latest_published": conn.execute("SELECT MAX(published_date) FROM cves").fetchone()[0]
+            }
@@ -0,0 +1,119 @@
+# backend/agents/cve_watermark.py
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional
+
+CVE_WATERMARK_PATH = "backend/data/cve_watermark.json"
+
+# Feeds name the modification timestamp differently (mock feed, NVD 2.0, OSV)
+MODIFIED_FIELDS = ("last_modified", "lastModified", "modified")
+
+def record_hash(record: Dict) -> str:
+    """Content hash of one CVE record, independent of key order"""
+    payload = json.dumps(record, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+def _timestamp(record: Dict, fields) -> Optional[str]:
+    for field in fields:
+        value = record.get(field)
+        if value:
+            return str(value)
+    return None
+
+class CVEWatermark:
+    """Remembers what the last successful plan ingested, so later runs only see deltas.
+
+    The watermark holds the newest published and modified timestamps seen and a
+    content hash per CVE ID. ``changed`` filters a feed down to CVEs that are
+    new or whose content changed, and stages an updated watermark as it goes.
+    ``commit`` persists the staged watermark. Callers commit only after the
+    plan built from the delta succeeded, so a failed run is retried in full,
+    and ``forget`` CVEs that failed individually so they are retried too.
+    """
+
+    def __init__(self, path: str = CVE_WATERMARK_PATH):
+        self.path = Path(path)
+        self.state = self._load()
+        self._staged: Optional[Dict] = None
+        self._staged_complete = False
+
+    def _load(self) -> Dict:
+        if self.path.exists():
+            with open(self.path, "r") as f:
+                return json.load(f)
+        return {"last_published": None, "last_modified": None, "hashes": {}}
+
+    def changed(self, records: Iterable[Dict], full_rescan: bool = False) -> Iterator[Dict]:
+        """Yield records that are new or modified since the committed watermark.
+
+        With ``full_rescan`` every record is yielded, and the staged watermark is
+        rebuilt from scratch the same way.
+        """
+        previous = {} if full_rescan else self.state.get("hashes", {})
+        last_modified = None if full_rescan else self.state.get("last_modified")
+        staged = {"last_published": None, "last_modified": None, "hashes": {}}
+        self._staged, self._staged_complete = staged, False
+        hashes = staged["hashes"]
+
+        for record in records:
+            cve_id = record.get("id") if isinstance(record, dict) else None
+            if not cve_id:
+                # Without an ID there is nothing to remember it by, so it is always processed
+                yield record
+                continue
+
+            published = _timestamp(record, ("published_date", "published"))
+            modified = _timestamp(record, MODIFIED_FIELDS)
+            if published and (staged["last_published"] is None or published > staged["last_published"]):
+                staged["last_published"] = published
+            if modified and (staged["last_modified"] is None or modified > staged["last_modified"]):
+                staged["last_modified"] = modified
+
+            # A record not modified since the watermark keeps its hash without being re-hashed
+            if modified and last_modified and modified <= last_modified and cve_id in previous:
+                hashes[cve_id] = previous[cve_id]
+                continue
+            digest = record_hash(record)
+            hashes[cve_id] = digest
+            if previous.get(cve_id) != digest:
+                yield record
+
+        self._staged_complete = True
+
+    def forget(self, cve_ids: Iterable[str]):
+        """Drop CVEs from the staged watermark so the next delta run yields them again.
+
+        Used for CVEs whose assessment failed; without a staged watermark there is
+        nothing to drop.
+        """
+        if self._staged is None:
+            return
+        hashes = self._staged["hashes"]
+        for cve_id in cve_ids:
+            hashes.pop(cve_id, None)
+
+    def commit(self):
+        """Persist the watermark staged by the last fully consumed ``changed`` call"""
+        if self._staged is None:
+            return
+        if not self._staged_complete:
+            raise RuntimeError("CVE feed was not fully consumed; refusing to advance the watermark")
+        self._staged["updated_at"] = datetime.now().isoformat()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".json.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(self._staged, f)
+        os.replace(tmp_path, self.path)
+        self.state, self._staged = self._staged, None
+
+    def summary(self) -> Dict:
+        return {
+            "last_published": self.state.get("last_published"),
+            "last_modified": self.state.get("last_modified"),
+            "tracked_cves": len(self.state.get("hashes", {})),
+            "updated_at": self.state.get("updated_at")
+        }
@@ -0,0 +1,37 @@
+# backend/agents/embedding_registry.py
+
+import threading
+from typing import TYPE_CHECKING, Dict, Iterable, List
+
+if TYPE_CHECKING:
+    from langchain_community.embeddings import HuggingFaceEmbeddings
+
+DEFAULT_EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+# One loaded model per name for the whole process, shared by every agent instance
+_models: Dict[str, "HuggingFaceEmbeddings"] = {}
+_lock = threading.Lock()
+
+def get_embeddings(model_name: str = DEFAULT_EMBEDDING_MODEL) -> "HuggingFaceEmbeddings":
+    """Return the shared embedding model, loading it on first use"""
+    model = _models.get(model_name)
+    if model is None:
+        with _lock:
+            model = _models.get(model_name)
+            if model is None:
+                # Deferred so importing the registry does not pull in the HuggingFace stack
+                from langchain_community.embeddings import HuggingFaceEmbeddings
+                print(f"[EmbeddingRegistry] Loading embedding model: {model_name}")
+                model = HuggingFaceEmbeddings(model_name=model_name)
+                _models[model_name] = model
+    return model
+
+def warm_up(model_names: Iterable[str] = (DEFAULT_EMBEDDING_MODEL,)) -> List[str]:
+    """Load the given models and run one embedding so the first real query is fast"""
+    for model_name in model_names:
+        get_embeddings(model_name).embed_query("warm-up")
+    return loaded_models()
+
+def loaded_models() -> List[str]:
+    """Names of the models currently held in memory"""
+    return list(_models)
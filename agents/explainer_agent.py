@@ -1,34 +1,88 @@
 # backend/agents/explainer_agent.py
 
+import asyncio
 import json
-from typing import Dict, List, Any
+from typing import Dict, List, Any, AsyncIterator, Optional
 from agents.llm_reasoner import LLMReasoningAgent
 
+# Returned instead of an LLM answer when a section has nothing to explain
+NO_COMPLIANCE_TEXT = "No specific compliance frameworks identified for this patch plan."
+
 class ExplainerAgent:
     def __init__(self):
         self.llm_reasoner = LLMReasoningAgent()
     
     def generate_patch_plan_summary(self, patch_plan: Dict[str, Any]) -> Dict[str, str]:
         """Generate comprehensive explanations for a patch plan"""
+        prompts = self._build_section_prompts(patch_plan)
+        return {
+            section: self.llm_reasoner.run(prompt) if prompt else NO_COMPLIANCE_TEXT
+            for section, prompt in prompts.items()
+        }
+    
+    async def agenerate_patch_plan_summary(self, patch_plan: Dict[str, Any]) -> Dict[str, str]:
+        """Async variant that generates all sections concurrently"""
+        prompts = self._build_section_prompts(patch_plan)
+        
+        async def explain(prompt: Optional[str]) -> str:
+            return await self.llm_reasoner.arun(prompt) if prompt else NO_COMPLIANCE_TEXT
+        
+        answers = await asyncio.gather(*(explain(prompt) for prompt in prompts.values()))
+        return dict(zip(prompts, answers))
+    
+    async def astream_patch_plan_summary(self, patch_plan: Dict[str, Any]) -> AsyncIterator[Dict[str, str]]:
+        """Stream all sections concurrently as section-tagged events.
+        
+        Yields {"event": "token", "section", "content"} for each text delta,
+        {"event": "section_end", "section"} when a section finishes and a final
+        {"event": "done"} once every section is complete.
+        """
+        prompts = self._build_section_prompts(patch_plan)
+        queue: asyncio.Queue = asyncio.Queue()
+        
+        async def produce(section: str, prompt: Optional[str]):
+            try:
+                if prompt:
+                    async for delta in self.llm_reasoner.astream(prompt):
+                        await queue.put({"event": "token", "section": section, "content": delta})
+                else:
+                    await queue.put({"event": "token", "section": section, "content": NO_COMPLIANCE_TEXT})
+            finally:
+                await queue.put({"event": "section_end", "section": section})
+        
+        producers = [asyncio.create_task(produce(section, prompt)) for section, prompt in prompts.items()]
+        try:
+            remaining = len(producers)
+            while remaining:
+                event = await queue.get()
+                if event["event"] == "section_end":
+                    remaining -= 1
+                yield event
+            yield {"event": "done"}
+        finally:
+            # Client disconnected mid-stream: stop the upstream completions too
+            for producer in producers:
+                producer.cancel()
+    
+    def _build_section_prompts(self, patch_plan: Dict[str, Any]) -> Dict[str, Optional[str]]:
+        """Build the LLM prompt for each explanation type (None when no LLM call is needed)"""
         
         # Extract key information
         scheduled_patches = patch_plan.get("scheduled_patches", [])
         metadata = patch_plan.get("plan_metadata", {})
         compliance_summary = metadata.get("compliance_summary", {})
         
-        # Generate different types of explanations
-        explanations = {
-            "executive_summary": self._generate_executive_summary(patch_plan),
-            "risk_analysis": self._generate_risk_analysis(scheduled_patches),
-            "compliance_impact": self._generate_compliance_explanation(compliance_summary),
-            "implementation_guide": self._generate_implementation_guide(scheduled_patches),
-            "business_impact": self._generate_business_impact(patch_plan)
+        # One prompt per explanation type
+        return {
+            "executive_summary": self._executive_summary_prompt(patch_plan),
+            "risk_analysis": self._risk_analysis_prompt(scheduled_patches),
+            "compliance_impact": self._compliance_explanation_prompt(compliance_summary),
+            "implementation_guide": self._implementation_guide_prompt(scheduled_patches),
+            "business_impact": self._business_impact_prompt(patch_plan)
         }
-        
-        return explanations
     
-    def _generate_executive_summary(self, patch_plan: Dict) -> str:
-        """Generate executive summary using LLM"""
+    def _executive_summary_prompt(self, patch_plan: Dict) -> str:
+        """Build the executive summary prompt"""
         scheduled_patches = patch_plan.get("scheduled_patches", [])
         metadata = patch_plan.get("plan_metadata", {})
         
@@ -56,10 +110,10 @@ class ExplainerAgent:
         Write in professional, executive-level language that non-technical stakeholders can understand.
         """
         
-        return self.llm_reasoner.run(prompt)
+        return prompt
     
-    def _generate_risk_analysis(self, scheduled_patches: List[Dict]) -> str:
-        """Generate risk analysis explanation"""
+    def _risk_analysis_prompt(self, scheduled_patches: List[Dict]) -> str:
+        """Build the risk analysis prompt"""
         
         # Analyze risk distribution
         risk_stats = {
@@ -99,16 +153,16 @@ class ExplainerAgent:
         Provide actionable insights about risk prioritization and mitigation strategies.
         """
         
-        return self.llm_reasoner.run(prompt)
+        return prompt
     
-    def _generate_compliance_explanation(self, compliance_summary: Dict) -> str:
-        """Generate compliance impact explanation"""
+    def _compliance_explanation_prompt(self, compliance_summary: Dict) -> Optional[str]:
+        """Build the compliance impact prompt"""
         
         frameworks = compliance_summary.get("frameworks_involved", [])
         docs_required = compliance_summary.get("patches_requiring_documentation", 0)
         
         if not frameworks:
-            return "No specific compliance frameworks identified for this patch plan."
+            return None
         
         context = f"""
         Compliance Requirements:
@@ -126,10 +180,10 @@ class ExplainerAgent:
         Focus on regulatory requirements, timelines, and documentation needs.
         """
         
-        return self.llm_reasoner.run(prompt)
+        return prompt
     
-    def _generate_implementation_guide(self, scheduled_patches: List[Dict]) -> str:
-        """Generate implementation guidance"""
+    def _implementation_guide_prompt(self, scheduled_patches: List[Dict]) -> str:
+        """Build the implementation guidance prompt"""
         
         # Group patches by timeline
         immediate = [p for p in scheduled_patches if p.get("risk_score", 0) >= 80]
@@ -157,10 +211,10 @@ class ExplainerAgent:
         Focus on operational considerations and best practices for safe deployment.
         """
         
-        return self.llm_reasoner.run(prompt)
+        return prompt
     
-    def _generate_business_impact(self, patch_plan: Dict) -> str:
-        """Generate business impact analysis"""
+    def _business_impact_prompt(self, patch_plan: Dict) -> str:
+        """Build the business impact prompt"""
         
         scheduled_patches = patch_plan.get("scheduled_patches", [])
         
@@ -188,10 +242,25 @@ class ExplainerAgent:
         Provide recommendations for minimizing business disruption while maintaining security.
         """
         
-        return self.llm_reasoner.run(prompt)
+        return prompt
     
     def explain_specific_patch(self, patch: Dict[str, Any]) -> str:
         """Generate detailed explanation for a specific patch"""
+        return self.llm_reasoner.run(self._specific_patch_prompt(patch), hedge=True)
+    
+    async def aexplain_specific_patch(self, patch: Dict[str, Any]) -> str:
+        """Async variant of explain_specific_patch"""
+        return await self.llm_reasoner.arun(self._specific_patch_prompt(patch), hedge=True)
+    
+    async def astream_specific_patch(self, patch: Dict[str, Any]) -> AsyncIterator[Dict[str, str]]:
+        """Stream the explanation for a specific patch as events, like astream_patch_plan_summary"""
+        async for delta in self.llm_reasoner.astream(self._specific_patch_prompt(patch)):
+            yield {"event": "token", "section": "explanation", "content": delta}
+        yield {"event": "section_end", "section": "explanation"}
+        yield {"event": "done"}
+    
+    def _specific_patch_prompt(self, patch: Dict[str, Any]) -> str:
+        """Build the prompt explaining a specific patch"""
         
         context = f"""
         Patch Details:
@@ -214,4 +283,4 @@ class ExplainerAgent:
         Make it understandable for both technical and non-technical stakeholders.
         """
         
-        return self.llm_reasoner.run(prompt)
\ No newline at end of file
+        return prompt
\ No newline at end of file
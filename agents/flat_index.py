@@ -0,0 +1,196 @@
+# backend/agents/flat_index.py
+
+import json
+import threading
+from pathlib import Path
+from typing import Dict, List, Tuple
+import numpy as np
+from agents.vector_backends import FLAT_INDEX_PATH, ChunkTable
+
+class FlatIndexBackend:
+    """Exact cosine search over a memory-mapped, quantised embedding matrix.
+
+    Vectors are L2-normalised and appended to ``vectors.bin`` as float16, or as
+    int8 with a per-row float32 scale in ``scales.bin``. Chunk ids, texts and
+    metadata live in a SQLite table keyed by row number. Deleted or replaced rows
+    are tombstoned in ``live.bin`` and reclaimed by ``compact``. Opening the index
+    only maps the files, so load time does not depend on corpus size and pages
+    are read on demand.
+    """
+
+    def __init__(self, index_dir: str = FLAT_INDEX_PATH, dtype: str = "float16", block_rows: int = 65536):
+        if dtype not in ("float16", "int8"):
+            raise ValueError(f"Unsupported flat index dtype: {dtype}")
+        self.index_dir = Path(index_dir)
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        self.block_rows = block_rows
+        self._lock = threading.RLock()
+        self._info_path = self.index_dir / "info.json"
+        self._vectors_path = self.index_dir / "vectors.bin"
+        self._scales_path = self.index_dir / "scales.bin"
+        self._live_path = self.index_dir / "live.bin"
+
+        self._chunks = ChunkTable(self.index_dir / "metadata.sqlite3", key="row")
+
+        self.info = {"dtype": dtype, "dim": None, "rows": 0}
+        if self._info_path.exists():
+            with open(self._info_path, "r") as f:
+                self.info = json.load(f)
+            if self.info["dtype"] != dtype:
+                raise ValueError(f"Flat index at {index_dir} uses {self.info['dtype']}, not {dtype}; call reset() first")
+        self._open_maps()
+
+    @property
+    def dtype(self) -> str:
+        return self.info["dtype"]
+
+    def __len__(self):
+        return len(self._chunks)
+
+    def _open_maps(self):
+        rows, dim = self.info["rows"], self.info["dim"]
+        if not rows:
+            self._vectors = self._scales = self._live = None
+            return
+        self._vectors = np.memmap(self._vectors_path, dtype=self.dtype, mode="r", shape=(rows, dim))
+        self._live = np.memmap(self._live_path, dtype=np.uint8, mode="r+", shape=(rows,))
+        self._scales = (np.memmap(self._scales_path, dtype=np.float32, mode="r", shape=(rows,))
+                        if self.dtype == "int8" else None)
+
+    def _save_info(self):
+        with open(self._info_path, "w") as f:
+            json.dump(self.info, f)
+
+    @staticmethod
+    def _normalise(vectors) -> np.ndarray:
+        matrix = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def upsert(self, ids: List[str], embeddings: List[List[float]], texts: List[str], metadatas: List[Dict]):
+        if not ids:
+            return
+        with self._lock:
+            self.delete(ids)
+            matrix = self._normalise(embeddings)
+            if self.info["dim"] is None:
+                self.info["dim"] = matrix.shape[1]
+            elif matrix.shape[1] != self.info["dim"]:
+                raise ValueError(f"Embedding dimension {matrix.shape[1]} does not match index dimension {self.info['dim']}")
+
+            if self.dtype == "int8":
+                scales = np.abs(matrix).max(axis=1) / 127.0
+                scales[scales == 0] = 1.0
+                quantised = np.round(matrix / scales[:, None]).astype(np.int8)
+                with open(self._scales_path, "ab") as f:
+                    f.write(scales.astype(np.float32).tobytes())
+            else:
+                quantised = matrix.astype(np.float16)
+            with open(self._vectors_path, "ab") as f:
+                f.write(quantised.tobytes())
+            with open(self._live_path, "ab") as f:
+                f.write(np.ones(len(ids), dtype=np.uint8).tobytes())
+
+            first_row = self.info["rows"]
+            self._chunks.insert(range(first_row, first_row + len(ids)), ids, texts, metadatas)
+            self._chunks.commit()
+            self.info["rows"] += len(ids)
+            self._save_info()
+            self._open_maps()
+
+    def delete(self, ids: List[str]):
+        with self._lock:
+            rows = list(self._chunks.keys_for(ids).values())
+            if not rows:
+                return
+            self._live[rows] = 0
+            self._live.flush()
+            self._chunks.delete_keys(rows)
+            self._chunks.commit()
+
+    def get(self, ids: List[str]) -> List[Dict]:
+        return self._chunks.get(ids)
+
+    def search(self, query_embeddings: List[List[float]], top_k: int) -> List[List[Tuple[str, str]]]:
+        if self._vectors is None or not len(query_embeddings):
+            return [[] for _ in query_embeddings]
+        queries = self._normalise(query_embeddings).T
+        best_scores = np.full((0, queries.shape[1]), -np.inf, dtype=np.float32)
+        best_rows = np.empty((0, queries.shape[1]), dtype=np.int64)
+
+        # Score block by block so only block_rows rows are decoded to float32 at a time
+        for start in range(0, self.info["rows"], self.block_rows):
+            end = min(start + self.block_rows, self.info["rows"])
+            block = np.asarray(self._vectors[start:end], dtype=np.float32)
+            if self._scales is not None:
+                block *= self._scales[start:end, None]
+            scores = block @ queries
+            scores[self._live[start:end] == 0] = -np.inf
+
+            rows = np.broadcast_to(np.arange(start, end)[:, None], scores.shape)
+            scores = np.vstack([best_scores, scores])
+            rows = np.vstack([best_rows, rows])
+            if scores.shape[0] > top_k:
+                keep = np.argpartition(-scores, top_k - 1, axis=0)[:top_k]
+                scores = np.take_along_axis(scores, keep, axis=0)
+                rows = np.take_along_axis(rows, keep, axis=0)
+            best_scores, best_rows = scores, rows
+
+        order = np.argsort(-best_scores, axis=0)
+        best_scores = np.take_along_axis(best_scores, order, axis=0)
+        best_rows = np.take_along_axis(best_rows, order, axis=0)
+
+        wanted = sorted({int(row) for row, score in zip(best_rows.ravel(), best_scores.ravel()) if score > -np.inf})
+        texts = self._chunks.texts_for(wanted)
+
+        results = []
+        for q in range(best_rows.shape[1]):
+            results.append([texts[int(row)] for row, score in zip(best_rows[:, q], best_scores[:, q])
+                            if score > -np.inf and int(row) in texts])
+        return results
+
+    def reset(self):
+        with self._lock:
+            self._vectors = self._scales = self._live = None
+            for path in (self._vectors_path, self._scales_path, self._live_path):
+                path.unlink(missing_ok=True)
+            self._chunks.clear()
+            self._chunks.commit()
+            self.info = {"dtype": self.dtype, "dim": None, "rows": 0}
+            self._save_info()
+
+    def compact(self):
+        """Rewrite the matrix without tombstoned rows and renumber the metadata table"""
+        with self._lock:
+            if self._live is None:
+                return
+            live_rows = np.flatnonzero(np.asarray(self._live))
+            vectors = np.asarray(self._vectors[live_rows])
+            scales = np.asarray(self._scales[live_rows]) if self._scales is not None else None
+            self._vectors = self._scales = self._live = None
+
+            self._vectors_path.write_bytes(vectors.tobytes())
+            if scales is not None:
+                self._scales_path.write_bytes(scales.astype(np.float32).tobytes())
+            self._live_path.write_bytes(np.ones(len(live_rows), dtype=np.uint8).tobytes())
+
+            conn = self._chunks.conn
+            conn.execute("CREATE TABLE chunks_compacted AS "
+                         "SELECT ROW_NUMBER() OVER (ORDER BY row) - 1 AS row, chunk_id, text, metadata FROM chunks")
+            conn.execute("DELETE FROM chunks")
+            conn.execute("INSERT INTO chunks SELECT row, chunk_id, text, metadata FROM chunks_compacted")
+            conn.execute("DROP TABLE chunks_compacted")
+            self._chunks.commit()
+
+            self.info["rows"] = len(live_rows)
+            self._save_info()
+            self._open_maps()
+
+    def persist(self):
+        """Flush writes and reclaim space once tombstones outnumber live rows"""
+        with self._lock:
+            self._chunks.commit()
+            live = len(self)
+            if self.info["rows"] - live > max(1024, live):
+                self.compact()
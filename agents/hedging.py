@@ -0,0 +1,188 @@
+# backend/agents/hedging.py
+
+import asyncio
+import math
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+class LatencyTracker:
+    """Online latency percentile over a sliding window of recent calls"""
+
+    def __init__(self, window: int = 512):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, q: float) -> Optional[float]:
+        with self._lock:
+            if not self._samples:
+                return None
+            ordered = sorted(self._samples)
+        rank = min(len(ordered) - 1, max(0, math.ceil(q / 100.0 * len(ordered)) - 1))
+        return ordered[rank]
+
+class HedgingPolicy:
+    """Duplicates a slow request once it outlives the tracked latency percentile.
+
+    The first answer wins and the other request is cancelled. Every primary call
+    earns ``budget_ratio`` hedge credits, capped at ``max_burst``. Each hedge
+    spends one credit, so extra upstream spend stays near ``budget_ratio`` even
+    when the provider is slow across the board. No call is hedged until
+    ``min_samples`` latencies have been observed, unless ``initial_delay`` is set.
+    """
+
+    def __init__(self, percentile: float = 90.0, budget_ratio: float = 0.1, min_samples: int = 20,
+                 min_delay: float = 0.05, initial_delay: float = None, max_burst: float = 5.0,
+                 window: int = 512):
+        self.percentile = percentile
+        self.budget_ratio = budget_ratio
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.initial_delay = initial_delay
+        self.max_burst = max_burst
+        self.tracker = LatencyTracker(window)
+        self._credits = max_burst
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.stats = {"requests": 0, "hedged": 0, "hedge_wins": 0, "budget_exhausted": 0}
+
+    @classmethod
+    def from_env(cls) -> Optional["HedgingPolicy"]:
+        """Policy configured from LLM_HEDGE_* variables, or None unless LLM_HEDGING_ENABLED is set"""
+        if os.getenv("LLM_HEDGING_ENABLED", "false").lower() not in ("1", "true", "yes"):
+            return None
+        return cls(percentile=float(os.getenv("LLM_HEDGE_PERCENTILE", "90")),
+                   budget_ratio=float(os.getenv("LLM_HEDGE_BUDGET", "0.1")))
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds to wait before hedging, or None while there is too little data"""
+        if len(self.tracker) < self.min_samples:
+            return self.initial_delay
+        return max(self.min_delay, self.tracker.percentile(self.percentile))
+
+    def _start(self):
+        with self._lock:
+            self.stats["requests"] += 1
+            self._credits = min(self.max_burst, self._credits + self.budget_ratio)
+
+    def _take_credit(self) -> bool:
+        with self._lock:
+            if self._credits < 1.0:
+                self.stats["budget_exhausted"] += 1
+                return False
+            self._credits -= 1.0
+            self.stats["hedged"] += 1
+            return True
+
+    def _hedge_won(self):
+        with self._lock:
+            self.stats["hedge_wins"] += 1
+
+    def run(self, fn: Callable[[], Any]) -> Any:
+        """Call fn, hedging it on a worker thread if it is slow.
+
+        A losing call that already started on a thread cannot be interrupted. Its
+        result is discarded when it finishes.
+        """
+        self._start()
+        delay = self.hedge_delay()
+        if delay is None:
+            return self._timed(fn)
+        executor = self._get_executor()
+        started = time.monotonic()
+        primary = executor.submit(fn)
+        done, _ = wait([primary], timeout=delay)
+        if done or not self._take_credit():
+            result = primary.result()
+            self.tracker.record(time.monotonic() - started)
+            return result
+
+        hedge = executor.submit(fn)
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    for loser in pending:
+                        loser.cancel()
+                    # A cancelled primary still ran at least this long; recording it keeps the tail honest
+                    self.tracker.record(time.monotonic() - started)
+                    if future is hedge:
+                        self._hedge_won()
+                    return future.result()
+                error = error or future.exception()
+        raise error
+
+    async def arun(self, coro_fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Await coro_fn(), starting a duplicate if the first has not returned within the hedge delay"""
+        self._start()
+        delay = self.hedge_delay()
+        started = time.monotonic()
+        tasks = [asyncio.ensure_future(coro_fn())]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done or not self._take_credit():
+                result = await tasks[0]
+                self.tracker.record(time.monotonic() - started)
+                return result
+
+            tasks.append(asyncio.ensure_future(coro_fn()))
+            pending = set(tasks)
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        self.tracker.record(time.monotonic() - started)
+                        if task is tasks[1]:
+                            self._hedge_won()
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def _timed(self, fn: Callable[[], Any]) -> Any:
+        started = time.monotonic()
+        result = fn()
+        self.tracker.record(time.monotonic() - started)
+        return result
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="llm-hedge")
+            return self._executor
+
+    def snapshot(self) -> Dict:
+        delay = self.hedge_delay()
+        with self._lock:
+            return {**self.stats, "samples": len(self.tracker),
+                    "hedge_delay_ms": round(delay * 1000, 1) if delay is not None else None}
+
+_default_policy: Optional[HedgingPolicy] = None
+_default_policy_loaded = False
+_default_policy_lock = threading.Lock()
+
+def get_default_hedging_policy() -> Optional[HedgingPolicy]:
+    """Process-wide policy shared by every LLMReasoningAgent, so latency window, budget and stats cover all callers"""
+    global _default_policy, _default_policy_loaded
+    if not _default_policy_loaded:
+        with _default_policy_lock:
+            if not _default_policy_loaded:
+                _default_policy = HedgingPolicy.from_env()
+                _default_policy_loaded = True
+    return _default_policy
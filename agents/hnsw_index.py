@@ -0,0 +1,182 @@
+# backend/agents/hnsw_index.py
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Tuple
+import numpy as np
+from agents.vector_backends import HNSW_INDEX_PATH, ChunkTable
+
+try:
+    import hnswlib
+except ImportError:  # optional dependency, only needed for the "hnsw" backend
+    hnswlib = None
+
+class HNSWBackend:
+    """Approximate nearest-neighbour search over a persisted HNSW graph snapshot.
+
+    The graph is built incrementally at ingest time and written on ``persist`` as an
+    atomic snapshot (``graph.bin`` plus ``info.json``); chunk ids, texts and metadata
+    live in SQLite keyed by the integer graph label. Row changes stay in an open
+    SQLite transaction until ``persist`` has written the snapshot, so an ingestion
+    interrupted before then leaves both as they were. ``shared`` returns one loaded
+    instance per index directory, so each API worker loads the snapshot once and
+    answers queries in-process. ``ef_search`` trades latency for recall.
+    """
+
+    _instances: Dict[str, "HNSWBackend"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, index_dir: str = HNSW_INDEX_PATH, ef_search: int = 64, ef_construction: int = 200,
+                 m: int = 16, initial_capacity: int = 10000):
+        if hnswlib is None:
+            raise ImportError("The hnsw vector backend requires the 'hnswlib' package (pip install hnswlib)")
+        self.index_dir = Path(index_dir)
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        self.ef_search = ef_search
+        self.ef_construction = ef_construction
+        self.m = m
+        self.initial_capacity = initial_capacity
+        self._lock = threading.RLock()
+        self._graph_path = self.index_dir / "graph.bin"
+        self._info_path = self.index_dir / "info.json"
+
+        self._chunks = ChunkTable(self.index_dir / "metadata.sqlite3", key="label")
+        self._graph = None
+        self.info = {"dim": None, "next_label": 0, "m": m, "ef_construction": ef_construction}
+        self._load_snapshot()
+
+    @classmethod
+    def shared(cls, index_dir: str = HNSW_INDEX_PATH, **options) -> "HNSWBackend":
+        """Process-wide instance for ``index_dir``, loading its snapshot on first use.
+
+        Later calls may change ``ef_search``, which only affects queries. Build
+        options that differ from the cached instance's raise ValueError.
+        """
+        key = str(Path(index_dir).resolve())
+        with cls._instances_lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(index_dir, **options)
+                return cls._instances[key]
+            instance = cls._instances[key]
+        conflicts = {name: value for name, value in options.items()
+                     if name != "ef_search" and getattr(instance, name) != value}
+        if conflicts:
+            raise ValueError(f"HNSW index at {index_dir} is already loaded with different options: {conflicts}")
+        if "ef_search" in options:
+            instance.set_ef(options["ef_search"])
+        return instance
+
+    def __len__(self):
+        return len(self._chunks)
+
+    def _load_snapshot(self):
+        if self._info_path.exists() and self._graph_path.exists():
+            with open(self._info_path, "r") as f:
+                self.info = json.load(f)
+            graph = hnswlib.Index(space="cosine", dim=self.info["dim"])
+            graph.load_index(str(self._graph_path), max_elements=self.info["capacity"])
+            graph.set_ef(self.ef_search)
+            self._graph = graph
+            print(f"[HNSWBackend] Loaded snapshot with {graph.get_current_count()} vectors from {self.index_dir}")
+        self._drop_orphaned_rows()
+
+    def _drop_orphaned_rows(self):
+        # Indexes written before rows were held until persist() may have rows newer than the snapshot
+        orphaned = self._chunks.conn.execute(
+            "DELETE FROM chunks WHERE label >= ?", (self.info["next_label"],)
+        ).rowcount
+        self._chunks.commit()
+        if orphaned:
+            print(f"[HNSWBackend] Dropped {orphaned} chunk rows with no vector in the snapshot")
+
+    def _ensure_graph(self, dim: int, extra: int):
+        if self._graph is None:
+            self.info.update({"dim": dim, "m": self.m, "ef_construction": self.ef_construction})
+            self._graph = hnswlib.Index(space="cosine", dim=dim)
+            self._graph.init_index(max_elements=max(self.initial_capacity, extra),
+                                   ef_construction=self.ef_construction, M=self.m)
+            self._graph.set_ef(self.ef_search)
+        elif dim != self.info["dim"]:
+            raise ValueError(f"Embedding dimension {dim} does not match index dimension {self.info['dim']}")
+        needed = self._graph.get_current_count() + extra
+        if needed > self._graph.get_max_elements():
+            self._graph.resize_index(max(needed, self._graph.get_max_elements() * 2))
+
+    def set_ef(self, ef_search: int):
+        with self._lock:
+            self.ef_search = ef_search
+            if self._graph is not None:
+                self._graph.set_ef(ef_search)
+
+    def upsert(self, ids: List[str], embeddings: List[List[float]], texts: List[str], metadatas: List[Dict]):
+        if not ids:
+            return
+        with self._lock:
+            self.delete(ids)
+            matrix = np.asarray(embeddings, dtype=np.float32)
+            self._ensure_graph(matrix.shape[1], len(ids))
+            first_label = self.info["next_label"]
+            labels = np.arange(first_label, first_label + len(ids))
+            self._graph.add_items(matrix, labels)
+            self._chunks.insert(labels, ids, texts, metadatas)
+            self.info["next_label"] += len(ids)
+
+    def delete(self, ids: List[str]):
+        with self._lock:
+            labels = list(self._chunks.keys_for(ids).values())
+            if not labels:
+                return
+            for label in labels:
+                if self._graph is None:
+                    break
+                try:
+                    self._graph.mark_deleted(label)
+                except RuntimeError:
+                    # Label missing from the graph or already deleted; only the row is left to drop
+                    pass
+            self._chunks.delete_keys(labels)
+
+    def get(self, ids: List[str]) -> List[Dict]:
+        return self._chunks.get(ids)
+
+    def search_labels(self, query_embeddings, top_k: int) -> np.ndarray:
+        """Raw k-NN graph labels per query, -1 padded when fewer than top_k vectors exist"""
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        k = min(top_k, len(self))
+        if self._graph is None or k == 0:
+            return np.full((len(queries), 0), -1, dtype=np.int64)
+        labels, _ = self._graph.knn_query(queries, k=k)
+        return labels
+
+    def search(self, query_embeddings: List[List[float]], top_k: int) -> List[List[Tuple[str, str]]]:
+        labels = self.search_labels(query_embeddings, top_k)
+        texts = self._chunks.texts_for(sorted({int(label) for label in labels.ravel()}))
+        return [[texts[int(label)] for label in row if int(label) in texts] for row in labels]
+
+    def reset(self):
+        with self._lock:
+            self._graph = None
+            self._graph_path.unlink(missing_ok=True)
+            self._info_path.unlink(missing_ok=True)
+            self._chunks.clear()
+            self._chunks.commit()
+            self.info = {"dim": None, "next_label": 0, "m": self.m, "ef_construction": self.ef_construction}
+
+    def persist(self):
+        """Write the graph and its info as a new snapshot, replacing the old one atomically"""
+        with self._lock:
+            if self._graph is None:
+                self._chunks.commit()
+                return
+            self.info["capacity"] = self._graph.get_max_elements()
+            tmp_graph = self._graph_path.with_suffix(".bin.tmp")
+            tmp_info = self._info_path.with_suffix(".json.tmp")
+            self._graph.save_index(str(tmp_graph))
+            with open(tmp_info, "w") as f:
+                json.dump(self.info, f)
+            os.replace(tmp_graph, self._graph_path)
+            os.replace(tmp_info, self._info_path)
+            # Rows become durable only once the snapshot holding their vectors is in place
+            self._chunks.commit()
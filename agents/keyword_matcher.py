@@ -0,0 +1,115 @@
+# backend/agents/keyword_matcher.py
+
+import re
+from typing import Dict, List, Set
+
+# Below this many keywords, C-level substring scans of the lower-cased text beat one regex pass
+SCAN_THRESHOLD = 192
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+class KeywordMatcher:
+    """Finds every occurrence of many keywords in one pass over the text.
+
+    The keywords are compiled into a single regex shaped like a trie, so each
+    text position is matched by walking shared prefixes instead of retrying
+    every keyword. The trie sits inside a lookahead, which finds overlapping
+    and nested occurrences. At each position the regex reports only the
+    longest keyword. The shorter keywords that must also match there (its
+    prefixes) come from a table built once, so results equal a substring test
+    per keyword. Small keyword sets without word boundaries skip the regex and
+    use substring scans instead.
+
+    Matching runs on ``text.lower()`` unless ``case_sensitive`` is set, so
+    positions index the lower-cased text. They equal offsets in the original
+    text unless lower-casing changed its length, which only a few non-ASCII
+    characters do. With ``word_boundaries`` a keyword only matches as a whole
+    word or phrase.
+    """
+
+    def __init__(self, keywords: List[str], word_boundaries: bool = False, case_sensitive: bool = False):
+        self.keywords = list(keywords)
+        self.word_boundaries = word_boundaries
+        self.case_sensitive = case_sensitive
+        self._terms = sorted({self._normalize(kw) for kw in self.keywords if kw}, key=len, reverse=True)
+        self._pattern = None
+        if self._terms and (word_boundaries or len(self._terms) >= SCAN_THRESHOLD):
+            self._also_matches = {term: self._implied_terms(term) for term in self._terms}
+            self._pattern = self._compile()
+
+    def _normalize(self, text: str) -> str:
+        return text if self.case_sensitive else text.lower()
+
+    def _implied_terms(self, term: str) -> List[str]:
+        """Shorter keywords that match wherever ``term`` matches at the same position"""
+        implied = []
+        for other in self._terms:
+            if len(other) < len(term) and term.startswith(other):
+                # With boundaries a prefix ending in a word character must not run on into one
+                if self.word_boundaries and _is_word_char(other[-1]) and _is_word_char(term[len(other)]):
+                    continue
+                implied.append(other)
+        return implied
+
+    def _compile(self):
+        trie: Dict = {}
+        for term in self._terms:
+            node = trie
+            for char in term:
+                node = node.setdefault(char, {})
+            node[""] = True
+
+        def end(char: str) -> str:
+            return r"(?!\w)" if self.word_boundaries and _is_word_char(char) else ""
+
+        def to_regex(node: Dict, last: str) -> str:
+            branches = [re.escape(char) + to_regex(child, char) for char, child in node.items() if char]
+            if not branches:
+                return end(last)
+            body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+            if "" in node:
+                # Longer keywords are tried first; ending here is the fallback
+                return f"(?:{body}|{end(last)})"
+            return body
+
+        parts = []
+        for first in sorted(trie):
+            start = r"(?<!\w)" if self.word_boundaries and _is_word_char(first) else ""
+            parts.append(start + re.escape(first) + to_regex(trie[first], first))
+        return re.compile("(?=(" + "|".join(parts) + "))")
+
+    def _by_keyword(self, found: Dict[str, List[int]]) -> Dict[str, List[int]]:
+        return {kw: found[self._normalize(kw)] for kw in self.keywords if kw and self._normalize(kw) in found}
+
+    def positions(self, text: str) -> Dict[str, List[int]]:
+        """Start offsets of every occurrence of each matched keyword, keyed by the keyword as given"""
+        haystack = self._normalize(text)
+        found: Dict[str, List[int]] = {}
+        if self._pattern is None:
+            for term in self._terms:
+                start = haystack.find(term)
+                while start != -1:
+                    found.setdefault(term, []).append(start)
+                    start = haystack.find(term, start + 1)
+            return self._by_keyword(found)
+
+        for match in self._pattern.finditer(haystack):
+            start = match.start()
+            term = match.group(1)
+            found.setdefault(term, []).append(start)
+            for implied in self._also_matches[term]:
+                found.setdefault(implied, []).append(start)
+        return self._by_keyword(found)
+
+    def find(self, text: str) -> List[str]:
+        """Keywords occurring in text, in the order (and multiplicity) they were given"""
+        haystack = self._normalize(text)
+        if self._pattern is None:
+            present: Set[str] = {term for term in self._terms if term in haystack}
+        else:
+            present = set()
+            for term in set(self._pattern.findall(haystack)):
+                present.add(term)
+                present.update(self._also_matches[term])
+        return [kw for kw in self.keywords if not kw or self._normalize(kw) in present]
@@ -0,0 +1,158 @@
+# backend/agents/lexical_index.py
+
+import math
+import re
+import sqlite3
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+# Keeps identifiers such as "cve-2025-54321" or "2.4.54" as single tokens
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[.\-][a-z0-9]+)*")
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+def is_identifier(token: str) -> bool:
+    """CVE IDs, versions and similar tokens that embeddings handle poorly"""
+    return any(ch.isdigit() for ch in token) and ("-" in token or "." in token)
+
+# SQLite caps bound parameters per statement; stay well below the oldest default (999)
+_SQL_BATCH = 500
+# Postings are inserted in term order in batches of this size, which keeps the B-tree writes local
+_FLUSH_POSTINGS = 50000
+
+class BM25Index:
+    """BM25 inverted index over vendor-note chunks, persisted in SQLite.
+
+    Only postings (term, chunk, term frequency) and chunk lengths are stored, so
+    opening the index reads nothing up front and chunk texts stay in the vector
+    store. Changes are written incrementally and committed by ``save``; apart
+    from a bounded buffer of pending postings, only the corpus size and total
+    length are kept in memory.
+    """
+
+    def __init__(self, index_path: str, k1: float = 1.5, b: float = 0.75):
+        self.index_path = Path(index_path)
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        self._pending: List[Tuple[str, int, int]] = []
+        self._conn = sqlite3.connect(self.index_path, check_same_thread=False)
+        self._conn.executescript(
+            # A chunk's distinct terms are kept with it, so removal deletes postings by primary key
+            "CREATE TABLE IF NOT EXISTS docs ("
+            "  doc INTEGER PRIMARY KEY, chunk_id TEXT UNIQUE NOT NULL, length INTEGER NOT NULL, terms TEXT NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS postings ("
+            "  term TEXT NOT NULL, doc INTEGER NOT NULL, tf INTEGER NOT NULL,"
+            "  PRIMARY KEY (term, doc)) WITHOUT ROWID;"
+        )
+        self.doc_count, self.total_length = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(length), 0) FROM docs"
+        ).fetchone()
+
+    def __len__(self):
+        return self.doc_count
+
+    def _flush(self):
+        if self._pending:
+            self._pending.sort()
+            self._conn.executemany("INSERT INTO postings (term, doc, tf) VALUES (?, ?, ?)", self._pending)
+            self._pending = []
+
+    def add(self, chunk_id: str, text: str):
+        with self._lock:
+            self.remove([chunk_id])
+            term_counts = Counter(tokenize(text))
+            length = sum(term_counts.values())
+            doc = self._conn.execute(
+                "INSERT INTO docs (chunk_id, length, terms) VALUES (?, ?, ?)",
+                (chunk_id, length, " ".join(term_counts))
+            ).lastrowid
+            self._pending.extend((term, doc, count) for term, count in term_counts.items())
+            if len(self._pending) >= _FLUSH_POSTINGS:
+                self._flush()
+            self.doc_count += 1
+            self.total_length += length
+
+    def remove(self, chunk_ids: Iterable[str]):
+        chunk_ids = list(chunk_ids)
+        with self._lock:
+            for start in range(0, len(chunk_ids), _SQL_BATCH):
+                batch = chunk_ids[start:start + _SQL_BATCH]
+                rows = self._conn.execute(
+                    f"SELECT doc, length, terms FROM docs WHERE chunk_id IN ({','.join('?' * len(batch))})", batch
+                ).fetchall()
+                if not rows:
+                    continue
+                # Only flush when a removed chunk may still have pending postings
+                self._flush()
+                self._conn.executemany(
+                    "DELETE FROM postings WHERE term = ? AND doc = ?",
+                    [(term, doc) for doc, _, terms in rows for term in terms.split()]
+                )
+                self._conn.executemany("DELETE FROM docs WHERE doc = ?", [(doc,) for doc, _, _ in rows])
+                self.doc_count -= len(rows)
+                self.total_length -= sum(length for _, length, _ in rows)
+
+    def clear(self):
+        with self._lock:
+            self._pending = []
+            self._conn.execute("DELETE FROM postings")
+            self._conn.execute("DELETE FROM docs")
+            self.doc_count = self.total_length = 0
+
+    def _posting(self, term: str) -> List[Tuple[str, int, int]]:
+        """(chunk_id, term frequency, chunk length) for every chunk containing term"""
+        return self._conn.execute(
+            "SELECT d.chunk_id, p.tf, d.length FROM postings p JOIN docs d ON d.doc = p.doc WHERE p.term = ?",
+            (term,)
+        ).fetchall()
+
+    def search(self, query: str, top_k: int = 3) -> List[Tuple[str, float]]:
+        with self._lock:
+            if not self.doc_count:
+                return []
+            self._flush()
+            doc_count = self.doc_count
+            avg_length = self.total_length / doc_count
+            scores: Dict[str, float] = {}
+            for term in set(tokenize(query)):
+                posting = self._posting(term)
+                if not posting:
+                    continue
+                idf = math.log(1 + (doc_count - len(posting) + 0.5) / (len(posting) + 0.5))
+                for chunk_id, tf, length in posting:
+                    norm = self.k1 * (1 - self.b + self.b * length / avg_length)
+                    scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
+
+    def identifier_search(self, query: str, top_k: int = 3) -> List[Tuple[str, float]]:
+        """BM25-ranked chunks containing every identifier token in the query, or [] if it has none"""
+        identifiers = [token for token in set(tokenize(query)) if is_identifier(token)]
+        if not identifiers:
+            return []
+        with self._lock:
+            self._flush()
+            hits = None
+            for token in identifiers:
+                found = {chunk_id for chunk_id, _, _ in self._posting(token)}
+                hits = found if hits is None else hits & found
+                if not hits:
+                    return []
+        return [(chunk_id, score) for chunk_id, score in self.search(query, top_k=self.doc_count)
+                if chunk_id in hits][:top_k]
+
+    def save(self):
+        with self._lock:
+            self._flush()
+            self._conn.commit()
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = 60) -> List[str]:
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, chunk_id in enumerate(ranking):
+            scores[chunk_id] = scores.get(chunk_id, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(scores, key=scores.get, reverse=True)
@@ -0,0 +1,38 @@
+# backend/agents/llm_cache.py
+
+import threading
+from typing import Optional
+from agents.sqlite_cache import SQLiteLRUCache
+
+LLM_CACHE_PATH = "backend/data/llm_cache.sqlite3"
+
+class LLMResponseCache(SQLiteLRUCache):
+    """SQLite-backed LLM completion cache with size- and age-based eviction.
+
+    Entries are keyed by a hash of (model, system prompt, user prompt, temperature)
+    and evicted least-recently-used once ``max_entries`` is exceeded or when older
+    than ``max_age_seconds``.
+    """
+
+    table = "llm_cache"
+    tag_column = "model"
+
+    def __init__(self, db_path: str = LLM_CACHE_PATH, max_entries: int = 5000,
+                 max_age_seconds: int = 30 * 24 * 3600):
+        super().__init__(db_path, max_entries, max_age_seconds)
+
+    @staticmethod
+    def make_key(model: str, system_prompt: str, user_prompt: str, temperature: float) -> str:
+        return SQLiteLRUCache.hash_key(model, system_prompt, user_prompt, temperature)
+
+_default_cache: Optional[LLMResponseCache] = None
+_default_cache_lock = threading.Lock()
+
+def get_default_response_cache() -> LLMResponseCache:
+    """Process-wide cache shared by every LLMReasoningAgent, so counters cover all callers"""
+    global _default_cache
+    if _default_cache is None:
+        with _default_cache_lock:
+            if _default_cache is None:
+                _default_cache = LLMResponseCache()
+    return _default_cache
@@ -0,0 +1,137 @@
+# backend/agents/llm_gateway.py
+
+import asyncio
+import os
+import threading
+import weakref
+from typing import AsyncIterator, Dict, Iterator, List, Optional
+import httpx
+from dotenv import load_dotenv
+from openai import AsyncOpenAI, OpenAI
+from agents.rate_limiter import AdaptiveRateLimiter, estimate_tokens
+
+load_dotenv()
+
+DEEPSEEK_BASE_URL = "https://api.deepseek.com/v1"
+DEFAULT_MODEL = "deepseek-chat"
+
+class LLMGateway:
+    """Shared DeepSeek client for every agent in the process.
+
+    Sync and async calls each go through a pooled HTTP client and their own
+    max-in-flight semaphore, so concurrent callers reuse keep-alive connections
+    and never exceed ``max_in_flight`` outstanding requests per interface. Both
+    share one AdaptiveRateLimiter that paces requests and owns all retries.
+    """
+
+    def __init__(self, api_key: str = None, base_url: str = DEEPSEEK_BASE_URL,
+                 max_in_flight: int = None, timeout: float = 120.0,
+                 rate_limiter: AdaptiveRateLimiter = None):
+        self.api_key = api_key or os.getenv("DEEPSEEK_API_KEY")
+        self.base_url = base_url
+        self.max_in_flight = max_in_flight or int(os.getenv("LLM_MAX_IN_FLIGHT", "8"))
+        self.timeout = timeout
+        tokens_per_minute = os.getenv("LLM_TOKENS_PER_MINUTE")
+        self.rate_limiter = rate_limiter or AdaptiveRateLimiter(
+            initial_rps=float(os.getenv("LLM_INITIAL_RPS", "2")),
+            max_rps=float(os.getenv("LLM_MAX_RPS", "20")),
+            tokens_per_minute=int(tokens_per_minute) if tokens_per_minute else None
+        )
+        self._limits = httpx.Limits(max_connections=self.max_in_flight,
+                                    max_keepalive_connections=self.max_in_flight)
+        # max_retries=0: the rate limiter decides when and how often to retry
+        self.client = OpenAI(
+            api_key=self.api_key, base_url=self.base_url, max_retries=0,
+            http_client=httpx.Client(limits=self._limits, timeout=timeout)
+        )
+        self._semaphore = threading.BoundedSemaphore(self.max_in_flight)
+        # asyncio primitives belong to one event loop, so keep one client/semaphore per loop
+        self._async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncOpenAI]" = weakref.WeakKeyDictionary()
+        self._async_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+    def _async_resources(self):
+        loop = asyncio.get_running_loop()
+        if loop not in self._async_clients:
+            self._async_clients[loop] = AsyncOpenAI(
+                api_key=self.api_key, base_url=self.base_url, max_retries=0,
+                http_client=httpx.AsyncClient(limits=self._limits, timeout=self.timeout)
+            )
+            self._async_semaphores[loop] = asyncio.Semaphore(self.max_in_flight)
+        return self._async_clients[loop], self._async_semaphores[loop]
+
+    @staticmethod
+    def _usage(response) -> Optional[int]:
+        usage = getattr(response, "usage", None)
+        return getattr(usage, "total_tokens", None)
+
+    def _create(self, messages, model, temperature, **kwargs):
+        def send():
+            with self._semaphore:
+                return self.client.chat.completions.create(
+                    model=model, messages=messages, temperature=temperature, **kwargs
+                )
+        return self.rate_limiter.call(send, estimate_tokens(messages), self._usage)
+
+    async def _acreate(self, messages, model, temperature, **kwargs):
+        client, semaphore = self._async_resources()
+
+        async def send():
+            async with semaphore:
+                return await client.chat.completions.create(
+                    model=model, messages=messages, temperature=temperature, **kwargs
+                )
+        return await self.rate_limiter.acall(send, estimate_tokens(messages), self._usage)
+
+    def complete(self, messages: List[Dict[str, str]], model: str = DEFAULT_MODEL,
+                 temperature: float = 0.3, **kwargs) -> str:
+        response = self._create(messages, model, temperature, **kwargs)
+        return response.choices[0].message.content.strip()
+
+    async def acomplete(self, messages: List[Dict[str, str]], model: str = DEFAULT_MODEL,
+                        temperature: float = 0.3, **kwargs) -> str:
+        response = await self._acreate(messages, model, temperature, **kwargs)
+        return response.choices[0].message.content.strip()
+
+    def stream(self, messages: List[Dict[str, str]], model: str = DEFAULT_MODEL,
+               temperature: float = 0.3, **kwargs) -> Iterator[str]:
+        """Yield completion text deltas as they arrive; the in-flight slot is held until the stream ends.
+
+        Only opening the stream is rate-limited and retried; a failure after the
+        first delta propagates to the caller.
+        """
+        with self._semaphore:
+            response = self.rate_limiter.call(
+                lambda: self.client.chat.completions.create(
+                    model=model, messages=messages, temperature=temperature, stream=True, **kwargs
+                ),
+                estimate_tokens(messages)
+            )
+            for chunk in response:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+
+    async def astream(self, messages: List[Dict[str, str]], model: str = DEFAULT_MODEL,
+                      temperature: float = 0.3, **kwargs) -> AsyncIterator[str]:
+        client, semaphore = self._async_resources()
+        async with semaphore:
+            response = await self.rate_limiter.acall(
+                lambda: client.chat.completions.create(
+                    model=model, messages=messages, temperature=temperature, stream=True, **kwargs
+                ),
+                estimate_tokens(messages)
+            )
+            async for chunk in response:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+
+_gateway: Optional[LLMGateway] = None
+_gateway_lock = threading.Lock()
+
+def get_llm_gateway() -> LLMGateway:
+    """Process-wide gateway, created on first use"""
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = LLMGateway()
+    return _gateway
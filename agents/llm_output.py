@@ -0,0 +1,25 @@
+# backend/agents/llm_output.py
+
+import json
+import re
+from typing import Dict, Optional
+
+_FENCE_PATTERN = re.compile(r"^```(?:json)?\s*(.*?)\s*```$", re.DOTALL)
+
+def parse_json_object(text: str) -> Optional[Dict]:
+    """Parse a JSON object from an LLM reply, tolerating code fences and surrounding prose"""
+    text = text.strip()
+    fenced = _FENCE_PATTERN.match(text)
+    if fenced:
+        text = fenced.group(1)
+    try:
+        value = json.loads(text)
+    except json.JSONDecodeError:
+        start, end = text.find("{"), text.rfind("}")
+        if start == -1 or end <= start:
+            return None
+        try:
+            value = json.loads(text[start:end + 1])
+        except json.JSONDecodeError:
+            return None
+    return value if isinstance(value, dict) else None
@@ -1,29 +1,154 @@
 # backend/agents/llm_reasoner.py
 
+import asyncio
 import os
-from dotenv import load_dotenv
-from openai import OpenAI
+from typing import AsyncIterator, Iterator, Union
+from agents.llm_cache import LLMResponseCache, get_default_response_cache
+from agents.hedging import HedgingPolicy, get_default_hedging_policy
+from agents.llm_gateway import DEFAULT_MODEL, LLMGateway, get_llm_gateway
+from agents.single_flight import SingleFlight
 
-load_dotenv()
+# Identical prompts in flight at the same time share one upstream call, across all agent instances
+_llm_single_flight = SingleFlight()
 
 class LLMReasoningAgent:
-    def __init__(self):
-        self.client = OpenAI(
-            api_key=os.getenv("DEEPSEEK_API_KEY"),
-            base_url="https://api.deepseek.com/v1"
-        )
-        self.model = "deepseek-chat"
-
-    def run(self, prompt: str) -> str:
+    def __init__(self, gateway: LLMGateway = None, cache: LLMResponseCache = None, use_cache: bool = None,
+                 hedging: HedgingPolicy = None):
+        self.gateway = gateway or get_llm_gateway()
+        self.model = DEFAULT_MODEL
+        self.temperature = 0.3
+        self.system_prompt = ("You are a cybersecurity patch analyst. Assess the risk level and urgency "
+                              "based on the technical description provided.")
+        if use_cache is None:
+            use_cache = os.getenv("LLM_CACHE_DISABLED", "false").lower() not in ("1", "true", "yes")
+        self.use_cache = use_cache
+        self._cache = cache
+        # Opt-in: only calls made with hedge=True are hedged, and only when a policy is configured
+        self.hedging = hedging if hedging is not None else get_default_hedging_policy()
+
+    @property
+    def cache(self) -> LLMResponseCache:
+        if self._cache is None:
+            self._cache = get_default_response_cache()
+        return self._cache
+
+    def _messages(self, prompt: str):
+        return [
+            {"role": "system", "content": self.system_prompt},
+            {"role": "user", "content": prompt}
+        ]
+
+    def _key(self, prompt: str, json_mode: bool = False) -> str:
+        # JSON-mode replies are formatted differently, so they never share a cache entry with free text
+        model = f"{self.model}+json" if json_mode else self.model
+        return LLMResponseCache.make_key(model, self.system_prompt, prompt, self.temperature)
+
+    @staticmethod
+    def _options(json_mode: bool) -> dict:
+        return {"response_format": {"type": "json_object"}} if json_mode else {}
+
+    def run(self, prompt: str, bypass_cache: bool = False, stream: bool = False,
+            hedge: bool = False, json_mode: bool = False) -> Union[str, Iterator[str]]:
+        """Return the completion for prompt, or with ``stream=True`` an iterator of text deltas.
+
+        ``hedge=True`` duplicates a slow upstream call under the agent's hedging policy.
+        ``json_mode=True`` asks the model for a single JSON object; the prompt must mention JSON.
+        """
+        if stream:
+            return self._stream(prompt, bypass_cache)
+        key = self._key(prompt, json_mode)
+        use_cache = self.use_cache and not bypass_cache
+        if use_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        def complete():
+            return self.gateway.complete(self._messages(prompt), model=self.model, temperature=self.temperature,
+                                         **self._options(json_mode))
+
+        def call():
+            response = self.hedging.run(complete) if hedge and self.hedging else complete()
+            if self.use_cache:
+                self.cache.put(key, self.model, response)
+            return response
+
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a cybersecurity patch analyst. Assess the risk level and urgency based on the technical description provided."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3
-            )
-            return response.choices[0].message.content.strip()
+            return _llm_single_flight.do(key, call)
         except Exception as e:
             return f"[LLM Error]: {str(e)}"
+
+    async def arun(self, prompt: str, bypass_cache: bool = False, hedge: bool = False,
+                   json_mode: bool = False) -> str:
+        """Non-blocking variant of run for async callers such as the API routers"""
+        key = self._key(prompt, json_mode)
+        use_cache = self.use_cache and not bypass_cache
+        if use_cache:
+            # The cache does blocking SQLite I/O; keep it off the event loop
+            cached = await asyncio.to_thread(self.cache.get, key)
+            if cached is not None:
+                return cached
+
+        def complete():
+            return self.gateway.acomplete(self._messages(prompt), model=self.model, temperature=self.temperature,
+                                          **self._options(json_mode))
+
+        async def call():
+            response = await (self.hedging.arun(complete) if hedge and self.hedging else complete())
+            if self.use_cache:
+                await asyncio.to_thread(self.cache.put, key, self.model, response)
+            return response
+
+        try:
+            return await _llm_single_flight.ado(key, call)
+        except Exception as e:
+            return f"[LLM Error]: {str(e)}"
+
+    def _stream(self, prompt: str, bypass_cache: bool) -> Iterator[str]:
+        # Streams bypass request coalescing; a cached answer is replayed as a single delta
+        key = self._key(prompt)
+        use_cache = self.use_cache and not bypass_cache
+        cached = self.cache.get(key) if use_cache else None
+        if cached is not None:
+            yield cached
+            return
+        parts = []
+        try:
+            for delta in self.gateway.stream(self._messages(prompt), model=self.model, temperature=self.temperature):
+                parts.append(delta)
+                yield delta
+        except Exception as e:
+            yield f"[LLM Error]: {str(e)}"
+            return
+        if self.use_cache:
+            self.cache.put(key, self.model, "".join(parts).strip())
+
+    async def astream(self, prompt: str, bypass_cache: bool = False) -> AsyncIterator[str]:
+        """Async iterator of text deltas for prompt"""
+        key = self._key(prompt)
+        use_cache = self.use_cache and not bypass_cache
+        cached = await asyncio.to_thread(self.cache.get, key) if use_cache else None
+        if cached is not None:
+            yield cached
+            return
+        parts = []
+        try:
+            async for delta in self.gateway.astream(self._messages(prompt), model=self.model, temperature=self.temperature):
+                parts.append(delta)
+                yield delta
+        except Exception as e:
+            yield f"[LLM Error]: {str(e)}"
+            return
+        if self.use_cache:
+            await asyncio.to_thread(self.cache.put, key, self.model, "".join(parts).strip())
+
+    def cache_stats(self):
+        return self.cache.stats()
+
+    def hedging_stats(self):
+        return self.hedging.snapshot() if self.hedging else None
+
+    @staticmethod
+    def coalescing_stats():
+        """How many upstream calls ran and how many callers were served by an in-flight one"""
+        return _llm_single_flight.stats()
@@ -1,21 +1,65 @@
 # backend/agents/patch_planner.py
 
-import json
 from pathlib import Path
+from agents.cve_feed import iter_cve_records
+from agents.cve_store import CVEStore
+from agents.cve_watermark import CVE_WATERMARK_PATH, CVEWatermark
+from agents.keyword_matcher import KeywordMatcher
 
 class PatchPlannerAgent:
-    def __init__(self, cve_file_path: str, vendor_notes_dir: str, policy_keywords: list = None):
+    def __init__(self, cve_file_path: str, vendor_notes_dir: str, policy_keywords: list = None,
+                 word_boundaries: bool = False, watermark_path: str = CVE_WATERMARK_PATH,
+                 cve_store: CVEStore = None):
         self.cve_file_path = Path(cve_file_path)
         self.vendor_notes_dir = Path(vendor_notes_dir)
         self.policy_keywords = policy_keywords or ["critical", "high", "reboot", "network"]
+        # Compiled once; each note is then scanned in a single pass for all keywords
+        self.keyword_matcher = KeywordMatcher(self.policy_keywords, word_boundaries=word_boundaries)
+        self.watermark = CVEWatermark(watermark_path)
+        # Optional indexed copy of the feed, kept current by every fetch and queried without reloading it
+        self.cve_store = cve_store
 
-    def fetch_latest_cves(self):
+    def fetch_latest_cves(self, stream: bool = False, delta: bool = False, full_rescan: bool = False):
+        """Load the CVE feed (JSON array, NDJSON, optionally gzip-compressed).
+
+        With ``stream=True`` records are yielded one at a time instead of being
+        loaded into a list, so large feeds are never held in memory at once.
+        With ``delta=True`` only CVEs new or changed since the last committed
+        watermark are returned; ``full_rescan`` returns everything but still
+        stages a fresh watermark. Call ``commit_watermark`` once they are planned.
+        Records returned are also upserted into ``cve_store`` when one is set.
+        """
         if not self.cve_file_path.exists():
             raise FileNotFoundError("CVE file not found.")
         
-        with open(self.cve_file_path, "r") as f:
-            cve_data = json.load(f)
-        return cve_data
+        records = iter_cve_records(self.cve_file_path)
+        if delta:
+            records = self.watermark.changed(records, full_rescan=full_rescan)
+        if self.cve_store is not None:
+            records = self.cve_store.upsert_stream(records)
+        return records if stream else list(records)
+
+    def sync_cve_store(self) -> int:
+        """Load the whole feed into the CVE store in one streaming pass; returns the record count"""
+        if self.cve_store is None:
+            raise ValueError("No CVE store configured.")
+        if not self.cve_file_path.exists():
+            raise FileNotFoundError("CVE file not found.")
+        return self.cve_store.upsert_many(iter_cve_records(self.cve_file_path))
+
+    def query_cves(self, **filters):
+        """CVEs from the indexed store matching ``filters`` (see ``CVEStore.query``)"""
+        if self.cve_store is None:
+            raise ValueError("No CVE store configured.")
+        return self.cve_store.query(**filters)
+
+    def commit_watermark(self, failed_ids: list = None):
+        """Record the feed state seen by the last delta fetch as successfully planned.
+
+        CVEs in ``failed_ids`` are left out, so the next delta fetch returns them again.
+        """
+        self.watermark.forget(failed_ids or [])
+        self.watermark.commit()
 
     def fetch_vendor_notes(self):
         notes = []
@@ -31,17 +75,18 @@ class PatchPlannerAgent:
     def extract_relevant_policy_terms(self, notes):
         extracted = []
         for note in notes:
-            matches = [kw for kw in self.policy_keywords if kw in note["content"].lower()]
+            positions = self.keyword_matcher.positions(note["content"])
             extracted.append({
                 "vendor": note["vendor"],
-                "matched_keywords": matches,
+                "matched_keywords": [kw for kw in self.policy_keywords if kw in positions],
+                "keyword_positions": positions,
                 "full_note": note["content"]
             })
         return extracted
 
-    def run(self):
+    def run(self, stream: bool = False, delta: bool = False, full_rescan: bool = False):
         print("[PatchPlannerAgent] Fetching latest CVEs...")
-        cves = self.fetch_latest_cves()
+        cves = self.fetch_latest_cves(stream=stream, delta=delta, full_rescan=full_rescan)
 
         print("[PatchPlannerAgent] Reading vendor patch notes...")
         vendor_notes = self.fetch_vendor_notes()
@@ -0,0 +1,24 @@
+# backend/agents/query_cache.py
+
+from agents.sqlite_cache import SQLiteLRUCache
+
+class QueryCache(SQLiteLRUCache):
+    """SQLite-backed cache of RAG answers with LRU and TTL eviction.
+
+    Every entry records the corpus version it was answered against, so
+    ``invalidate`` can drop all answers produced from an older corpus.
+    """
+
+    table = "query_cache"
+    tag_column = "corpus_version"
+
+    def __init__(self, db_path: str, max_entries: int = 512, ttl_seconds: int = 7 * 24 * 3600):
+        super().__init__(db_path, max_entries, ttl_seconds)
+
+    @staticmethod
+    def make_key(question: str, top_k: int, corpus_version: str, model: str) -> str:
+        return SQLiteLRUCache.hash_key(question, top_k, corpus_version, model)
+
+    def invalidate(self, current_version: str = None) -> int:
+        """Drop every entry not answered against ``current_version`` (all entries if None)"""
+        return super().invalidate(current_version)
@@ -0,0 +1,113 @@
+# backend/agents/rag_ingestion.py
+
+import multiprocessing
+import re
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
+from agents.embedding_registry import DEFAULT_EMBEDDING_MODEL, get_embeddings
+
+# (chunk_id, text, metadata)
+Chunk = Tuple[str, str, Dict]
+UpsertFn = Callable[[List[str], List[List[float]], List[str], List[Dict]], None]
+
+CVE_PATTERN = re.compile(r"\bCVE-\d{4}-\d{4,}\b", re.IGNORECASE)
+# Capitalised product name of up to three words followed by a dotted version, e.g. "Apache HTTP Server 2.4.54"
+PRODUCT_PATTERN = re.compile(r"\b((?:[A-Z][A-Za-z0-9+\-]*\s){1,3})v?(\d+(?:\.\d+)+)\b")
+
+def extract_entities(text: str) -> Dict[str, List[str]]:
+    """CVE IDs, products and versions mentioned in a piece of text, in first-seen order"""
+    cve_ids = list(dict.fromkeys(match.upper() for match in CVE_PATTERN.findall(text)))
+    products, versions = [], []
+    for name, version in PRODUCT_PATTERN.findall(text):
+        products.append(f"{name.strip()} {version}")
+        versions.append(version)
+    return {
+        "cve_ids": cve_ids,
+        "products": list(dict.fromkeys(products)),
+        "versions": list(dict.fromkeys(versions))
+    }
+
+def entity_metadata(text: str) -> Dict[str, str]:
+    # Vector stores only accept scalar metadata, so lists are stored comma-separated
+    return {key: ",".join(values) for key, values in extract_entities(text).items()}
+
+def iter_file_chunks(files: Iterable[Path], chunk_size: int = 512, chunk_overlap: int = 50) -> Iterator[Chunk]:
+    """Lazily read and split files, holding only one file in memory at a time.
+
+    Each chunk's metadata is tagged with the CVE IDs, products and versions it mentions.
+    """
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    for path in files:
+        with open(path, "r") as f:
+            text = f.read()
+        pieces = (piece for piece in splitter.split_text(text) if piece.strip() != "")
+        for index, piece in enumerate(pieces):
+            yield f"{path}#{index}", piece, {"source": str(path), **entity_metadata(piece)}
+
+def _batched(chunks: Iterable[Chunk], size: int) -> Iterator[List[Chunk]]:
+    iterator = iter(chunks)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+def _embed_texts(model_name: str, texts: List[str]) -> List[List[float]]:
+    # Runs inside pool workers; the registry keeps one model per worker process
+    return get_embeddings(model_name).embed_documents(texts)
+
+class EmbeddingPipeline:
+    """Embeds a chunk stream in fixed-size batches and upserts each batch as it completes.
+
+    At most ``max_pending`` batches are in flight, so memory stays bounded by
+    batch_size * max_pending regardless of corpus size.
+    """
+
+    def __init__(self, model_name: str = DEFAULT_EMBEDDING_MODEL, batch_size: int = 256,
+                 workers: int = 1, max_pending: int = None):
+        self.model_name = model_name
+        self.batch_size = max(1, batch_size)
+        self.workers = max(1, workers)
+        self.max_pending = max_pending or self.workers * 2
+
+    def run(self, chunks: Iterable[Chunk], upsert: UpsertFn) -> Dict:
+        stats = {"chunks": 0, "batches": 0, "seconds": 0.0, "chunks_per_sec": 0.0}
+        started = time.perf_counter()
+
+        def flush(batch: List[Chunk], embeddings: List[List[float]]):
+            ids, texts, metadatas = (list(column) for column in zip(*batch))
+            upsert(ids, embeddings, texts, metadatas)
+            stats["chunks"] += len(batch)
+            stats["batches"] += 1
+            elapsed = time.perf_counter() - started
+            rate = stats["chunks"] / elapsed if elapsed > 0 else 0.0
+            print(f"[EmbeddingPipeline] Batch {stats['batches']}: {stats['chunks']} chunks embedded "
+                  f"({rate:.1f} chunks/sec)")
+
+        if self.workers == 1:
+            for batch in _batched(chunks, self.batch_size):
+                flush(batch, _embed_texts(self.model_name, [text for _, text, _ in batch]))
+        else:
+            # spawn, not fork: the parent may already hold torch/tokenizer threads
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=self.workers, mp_context=context) as pool:
+                pending = deque()
+                for batch in _batched(chunks, self.batch_size):
+                    if len(pending) >= self.max_pending:
+                        done_batch, future = pending.popleft()
+                        flush(done_batch, future.result())
+                    texts = [text for _, text, _ in batch]
+                    pending.append((batch, pool.submit(_embed_texts, self.model_name, texts)))
+                while pending:
+                    done_batch, future = pending.popleft()
+                    flush(done_batch, future.result())
+
+        stats["seconds"] = round(time.perf_counter() - started, 3)
+        if stats["seconds"] > 0:
+            stats["chunks_per_sec"] = round(stats["chunks"] / stats["seconds"], 1)
+        return stats
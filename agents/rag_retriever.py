@@ -1,94 +1,373 @@
 # backend/agents/rag_retriever.py
 
-import os
+import hashlib
+import json
 from pathlib import Path
-from dotenv import load_dotenv
-from langchain_community.vectorstores import Chroma
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from langchain_community.document_loaders import TextLoader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_core.prompts import PromptTemplate
-from langchain_core.runnables import RunnableLambda
+from typing import Dict, List, Tuple
+from agents.embedding_registry import DEFAULT_EMBEDDING_MODEL, get_embeddings
+from agents.rag_ingestion import EmbeddingPipeline, iter_file_chunks
+from agents.query_cache import QueryCache
+from agents.lexical_index import BM25Index, reciprocal_rank_fusion
+from agents.llm_output import parse_json_object
+from agents.vector_backends import create_vector_backend
 
-load_dotenv()
+# Heavy dependencies (langchain, Chroma, sentence-transformers, openai) are imported
+# on first use so that importing this module stays cheap and side-effect free.
 
-# Load DeepSeek key (OpenAI compatible format)
-os.environ["OPENAI_API_KEY"] = os.getenv("DEEPSEEK_API_KEY")
-os.environ["OPENAI_API_BASE"] = "https://api.deepseek.com/v1"
-
-CHROMA_PATH = "backend/rag_store/chromadb"
+MANIFEST_PATH = "backend/rag_store/manifest.json"
+QUERY_CACHE_PATH = "backend/rag_store/query_cache.sqlite3"
+LEXICAL_INDEX_PATH = "backend/rag_store/lexical_index.sqlite3"
+# Recorded in the manifest; a different value means the lexical index must be rebuilt from the notes
+LEXICAL_INDEX_FORMAT = "sqlite-postings-1"
+LLM_MODEL = "deepseek-chat"
 
 class RAGRetrieverAgent:
-    def __init__(self, vendor_notes_dir: str):
+    def __init__(self, vendor_notes_dir: str, manifest_path: str = MANIFEST_PATH,
+                 embedding_model: str = DEFAULT_EMBEDDING_MODEL, query_cache_path: str = QUERY_CACHE_PATH,
+                 lexical_index_path: str = LEXICAL_INDEX_PATH, vector_backend: str = "chroma",
+                 vector_backend_options: Dict = None):
         self.vendor_notes_dir = Path(vendor_notes_dir)
-        self.vectorstore = None
+        self.manifest_path = Path(manifest_path)
+        self.embedding_model = embedding_model
+        self.vector_backend = vector_backend
+        self.vector_backend_options = vector_backend_options or {}
+        self._backend = None
+        self.query_cache_path = query_cache_path
+        self.lexical_index_path = lexical_index_path
+        self.corpus_version = None
+        self._cve_index = None
+        self._query_cache = None
+        self._lexical_index = None
+
+    # Stores are opened on first use so that constructing the agent touches no files
+    @property
+    def query_cache(self) -> QueryCache:
+        if self._query_cache is None:
+            self._query_cache = QueryCache(self.query_cache_path)
+        return self._query_cache
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            self._backend = create_vector_backend(self.vector_backend, **self.vector_backend_options)
+        return self._backend
+
+    @property
+    def lexical_index(self) -> BM25Index:
+        if self._lexical_index is None:
+            self._lexical_index = BM25Index(self.lexical_index_path)
+        return self._lexical_index
 
-    def ingest_documents(self):
+    def ingest_documents(self, incremental: bool = True, batch_size: int = 256, workers: int = 1):
+        """Embed vendor notes, skipping files whose content hash is unchanged.
+
+        Files are streamed through an EmbeddingPipeline: read lazily, embedded in
+        ``batch_size`` batches (across ``workers`` processes when > 1) and upserted
+        batch by batch. With ``incremental=False``, or when no manifest exists yet,
+        the collection is dropped and rebuilt from scratch. Returns the number of chunks embedded by this call.
+        """
         print("[RAGRetrieverAgent] Ingesting vendor notes...")
 
-        all_docs = []
-        found_files = list(self.vendor_notes_dir.rglob("*.txt"))
+        found_files = sorted(self.vendor_notes_dir.rglob("*.txt"))
 
         if not found_files:
             raise FileNotFoundError("No vendor notes found under the specified directory.")
 
-        for file_path in found_files:
-            print(f"  - Found file: {file_path}")
-            with open(file_path, 'r') as f:
-                content = f.read()
-                print(f"    Contents:\n{content[:150]}...\n")
+        backend = self.backend
+        manifest = self._load_manifest()
+        if manifest["files"] and manifest.get("vector_backend", "chroma") != self.vector_backend:
+            print(f"[RAGRetrieverAgent] Vector backend changed to {self.vector_backend}, rebuilding index.")
+            incremental = False
+        if not manifest["files"]:
+            # No manifest yet: earlier non-incremental runs may have left untracked chunks behind
+            incremental = False
+        if not incremental:
+            backend.reset()
+            self.lexical_index.clear()
+            manifest = {"files": {}}
+        manifest["vector_backend"] = self.vector_backend
+
+        previous = manifest["files"]
+        current = {str(path): self._hash_file(path) for path in found_files}
+
+        removed = [key for key in previous if key not in current]
+        # Entries written before CVE tagging or the current lexical index format are re-embedded once
+        rebuild_all = bool(previous) and manifest.get("lexical_index") != LEXICAL_INDEX_FORMAT
+        changed = [path for path in found_files
+                   if previous.get(str(path), {}).get("sha256") != current[str(path)]
+                   or "cve_index" not in previous[str(path)]
+                   or rebuild_all]
+
+        if not removed and not changed:
+            print("[RAGRetrieverAgent] Vendor notes unchanged, skipping embedding.")
+            if "corpus_version" not in manifest:
+                manifest["corpus_version"] = self._compute_corpus_version(previous)
+                self._save_manifest(manifest)
+            self.corpus_version = manifest["corpus_version"]
+            return 0
 
-            loader = TextLoader(str(file_path))
-            docs = loader.load()
-            all_docs.extend(docs)
+        stale_ids = []
+        for key in removed + [str(path) for path in changed]:
+            stale_ids.extend(previous.get(key, {}).get("chunk_ids", []))
+        if stale_ids:
+            print(f"[RAGRetrieverAgent] Removing {len(stale_ids)} stale chunks...")
+            backend.delete(stale_ids)
+            self.lexical_index.remove(stale_ids)
+        for key in removed:
+            previous.pop(key, None)
 
-        splitter = RecursiveCharacterTextSplitter(chunk_size=512, chunk_overlap=50)
-        chunks = splitter.split_documents(all_docs)
+        chunk_ids: Dict[str, List[str]] = {str(path): [] for path in changed}
+        cve_chunks: Dict[str, Dict[str, List[str]]] = {str(path): {} for path in changed}
 
-        valid_chunks = [chunk for chunk in chunks if chunk.page_content.strip() != ""]
+        def tracked_chunks():
+            for file_path in changed:
+                print(f"  - Found new or changed file: {file_path}")
+                for chunk in iter_file_chunks([file_path]):
+                    chunk_id, text, metadata = chunk
+                    chunk_ids[str(file_path)].append(chunk_id)
+                    self.lexical_index.add(chunk_id, text)
+                    for cve_id in filter(None, metadata["cve_ids"].split(",")):
+                        cve_chunks[str(file_path)].setdefault(cve_id, []).append(chunk_id)
+                    yield chunk
 
-        if not valid_chunks:
+        pipeline = EmbeddingPipeline(model_name=self.embedding_model, batch_size=batch_size, workers=workers)
+        stats = pipeline.run(tracked_chunks(), backend.upsert)
+
+        for key, file_chunk_ids in chunk_ids.items():
+            previous[key] = {"sha256": current[key], "chunk_ids": file_chunk_ids, "cve_index": cve_chunks[key]}
+
+        if not any(entry["chunk_ids"] for entry in previous.values()):
             raise ValueError("No valid content chunks found to embed.")
 
-        print(f"[RAGRetrieverAgent] Preparing {len(valid_chunks)} chunks for embedding...")
+        backend.persist()
+        self.lexical_index.save()
+        manifest["lexical_index"] = LEXICAL_INDEX_FORMAT
+        manifest["corpus_version"] = self._compute_corpus_version(previous)
+        self._save_manifest(manifest)
+        self.corpus_version = manifest["corpus_version"]
+        self._cve_index = None
+        evicted = self.query_cache.invalidate(self.corpus_version)
+        if evicted:
+            print(f"[RAGRetrieverAgent] Corpus changed, dropped {evicted} cached answers.")
+
+        print(f"[RAGRetrieverAgent] Ingested {stats['chunks']} valid chunks "
+              f"({len(changed)} new or changed files, {len(removed)} removed) "
+              f"in {stats['seconds']}s ({stats['chunks_per_sec']} chunks/sec).")
+        return stats["chunks"]
+
+    def _load_manifest(self) -> Dict:
+        if not self.manifest_path.exists():
+            return {"files": {}}
+        with open(self.manifest_path, "r") as f:
+            return json.load(f)
+
+    def _save_manifest(self, manifest: Dict):
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.manifest_path, "w") as f:
+            json.dump(manifest, f, indent=2)
+
+    @staticmethod
+    def _compute_corpus_version(files: Dict) -> str:
+        digest = hashlib.sha256()
+        for key in sorted(files):
+            digest.update(f"{key}\0{files[key]['sha256']}\n".encode("utf-8"))
+        return digest.hexdigest()
+
+    def _get_corpus_version(self) -> str:
+        if self.corpus_version is None:
+            self.corpus_version = self._load_manifest().get("corpus_version")
+        return self.corpus_version
+
+    @staticmethod
+    def _hash_file(path: Path) -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 16), b""):
+                digest.update(block)
+        return digest.hexdigest()
 
-        embeddings = HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
-        self.vectorstore = Chroma.from_documents(valid_chunks, embeddings, persist_directory=CHROMA_PATH)
-        self.vectorstore.persist()
+    def _get_cve_index(self) -> Dict[str, List[str]]:
+        if self._cve_index is None:
+            index: Dict[str, List[str]] = {}
+            for entry in self._load_manifest()["files"].values():
+                for cve_id, ids in entry.get("cve_index", {}).items():
+                    index.setdefault(cve_id, []).extend(ids)
+            self._cve_index = index
+        return self._cve_index
 
-        print(f"[RAGRetrieverAgent] Ingested {len(valid_chunks)} valid chunks.")
-        return len(valid_chunks)
+    def get_cve_context(self, cve_id: str) -> List[Dict]:
+        """Return every vendor-note chunk that mentions ``cve_id`` via the exact CVE index"""
+        chunk_ids = self._get_cve_index().get(cve_id.upper(), [])
+        if not chunk_ids:
+            return []
 
+        return self.backend.get(chunk_ids)
 
+    def retrieve(self, question: str, top_k: int = 3, retrieval: str = "hybrid") -> List[Tuple[str, str]]:
+        """Return (chunk_id, text) pairs for the question.
 
+        ``retrieval`` is "vector", "lexical" or "hybrid". In hybrid mode a query whose
+        identifiers (CVE IDs, versions) all occur in some chunks is answered from the
+        BM25 index alone, skipping the embedding step; otherwise the BM25 and vector
+        rankings are merged with reciprocal rank fusion.
+        """
+        return self.retrieve_many([question], top_k=top_k, retrieval=retrieval)[0]
 
-    def query(self, question: str, top_k=3):
-        if not self.vectorstore:
-            embeddings = HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
-            self.vectorstore = Chroma(persist_directory=CHROMA_PATH, embedding_function=embeddings)
+    def retrieve_many(self, questions: List[str], top_k: int = 3,
+                      retrieval: str = "hybrid") -> List[List[Tuple[str, str]]]:
+        """Batch form of ``retrieve``: one embedding pass and one vector search for all questions"""
+        if retrieval not in ("vector", "lexical", "hybrid"):
+            raise ValueError(f"Unknown retrieval mode: {retrieval}")
 
-        retriever = self.vectorstore.as_retriever(search_kwargs={"k": top_k})
-        docs = retriever.get_relevant_documents(question)
+        results: List[List[Tuple[str, str]]] = [[] for _ in questions]
+        needs_vector = []
+        for i, question in enumerate(questions):
+            if retrieval != "vector" and len(self.lexical_index):
+                if retrieval == "lexical":
+                    lexical = self.lexical_index.search(question, top_k)
+                else:
+                    lexical = self.lexical_index.identifier_search(question, top_k)
+                if lexical:
+                    texts = self._chunk_texts([chunk_id for chunk_id, _ in lexical])
+                    results[i] = [(chunk_id, texts[chunk_id]) for chunk_id, _ in lexical if chunk_id in texts]
+                    continue
+                if retrieval == "lexical":
+                    continue
+            needs_vector.append(i)
 
-        context = "\n\n".join([doc.page_content for doc in docs])
+        if not needs_vector:
+            return results
+
+        embeddings = get_embeddings(self.embedding_model).embed_documents([questions[i] for i in needs_vector])
+        for i, hits in zip(needs_vector, self.backend.search(embeddings, top_k)):
+            texts = dict(hits)
+            if retrieval == "vector" or not len(self.lexical_index):
+                results[i] = list(texts.items())
+                continue
+            lexical_ids = [chunk_id for chunk_id, _ in self.lexical_index.search(questions[i], top_k)]
+            fused = reciprocal_rank_fusion([lexical_ids, list(texts)])[:top_k]
+            texts.update(self._chunk_texts([chunk_id for chunk_id in fused if chunk_id not in texts]))
+            results[i] = [(chunk_id, texts[chunk_id]) for chunk_id in fused if chunk_id in texts]
+        return results
+
+    def _chunk_texts(self, chunk_ids: List[str]) -> Dict[str, str]:
+        # The lexical index holds no texts; they are read from the vector store
+        if not chunk_ids:
+            return {}
+        return {chunk["chunk_id"]: chunk["text"] for chunk in self.backend.get(chunk_ids)}
+
+    def _cache_key(self, question: str, top_k: int, retrieval: str):
+        corpus_version = self._get_corpus_version()
+        if not corpus_version:
+            return None
+        model = f"{self.embedding_model}|{LLM_MODEL}|{retrieval}"
+        return QueryCache.make_key(question, top_k, corpus_version, model)
+
+    @staticmethod
+    def _build_prompt(context: str, question: str) -> str:
+        from langchain_core.prompts import PromptTemplate
         prompt = PromptTemplate.from_template(
             "You are a patch planning assistant. Based on the following vendor context:\n\n{context}\n\nAnswer this: {question}"
         )
+        return prompt.format(context=context, question=question)
 
-        chain = RunnableLambda(lambda inputs: self._llm_call(prompt.format(**inputs)))
+    def query(self, question: str, top_k=3, use_cache: bool = True, retrieval: str = "hybrid"):
+        cache_key = self._cache_key(question, top_k, retrieval) if use_cache else None
+        if cache_key:
+            cached = self.query_cache.get(cache_key)
+            if cached is not None:
+                print("[RAGRetrieverAgent] Answer served from query cache.")
+                return cached
+
+        docs = self.retrieve(question, top_k=top_k, retrieval=retrieval)
+
+        from langchain_core.runnables import RunnableLambda
+        context = "\n\n".join([text for _, text in docs])
+        chain = RunnableLambda(lambda inputs: self._llm_call(self._build_prompt(**inputs)))
         response = chain.invoke({"context": context, "question": question})
+
+        if cache_key:
+            self.query_cache.put(cache_key, self.corpus_version, response)
         return response
 
-    def _llm_call(self, full_prompt: str):
-        from openai import OpenAI
-        client = OpenAI(api_key=os.getenv("DEEPSEEK_API_KEY"), base_url="https://api.deepseek.com/v1")
+    def query_many(self, questions: List[str], top_k: int = 3, use_cache: bool = True,
+                   retrieval: str = "hybrid", pack_size: int = 1) -> List[str]:
+        """Answer several questions with one batched retrieval.
 
-        response = client.chat.completions.create(
-            model="deepseek-chat",
-            messages=[
+        With ``pack_size`` > 1, up to that many questions share one LLM prompt built
+        from their deduplicated chunks and are answered as a JSON object keyed by
+        question number. Any question missing from the parsed reply falls back to an
+        individual LLM call. Answers are returned in input order.
+        """
+        answers: List[str] = [None] * len(questions)
+        cache_keys = [self._cache_key(q, top_k, retrieval) if use_cache else None for q in questions]
+        pending = []
+        for i, cache_key in enumerate(cache_keys):
+            cached = self.query_cache.get(cache_key) if cache_key else None
+            if cached is not None:
+                answers[i] = cached
+            else:
+                pending.append(i)
+        if len(pending) < len(questions):
+            print(f"[RAGRetrieverAgent] {len(questions) - len(pending)} of {len(questions)} answers served from query cache.")
+        if not pending:
+            return answers
+
+        docs = dict(zip(pending, self.retrieve_many([questions[i] for i in pending], top_k=top_k, retrieval=retrieval)))
+
+        pack_size = max(1, pack_size)
+        for start in range(0, len(pending), pack_size):
+            pack = pending[start:start + pack_size]
+            if len(pack) > 1:
+                for i, answer in self._answer_pack(pack, questions, docs).items():
+                    answers[i] = answer
+            for i in pack:
+                if answers[i] is None:
+                    context = "\n\n".join([text for _, text in docs[i]])
+                    answers[i] = self._llm_call(self._build_prompt(context, questions[i]))
+                if cache_keys[i]:
+                    self.query_cache.put(cache_keys[i], self.corpus_version, answers[i])
+        return answers
+
+    def _answer_pack(self, pack: List[int], questions: List[str],
+                     docs: Dict[int, List[Tuple[str, str]]]) -> Dict[int, str]:
+        # Each chunk appears once in the shared context; questions cite chunks by number
+        chunk_numbers: Dict[str, int] = {}
+        context_lines = []
+        question_lines = []
+        for n, i in enumerate(pack, start=1):
+            refs = []
+            for chunk_id, text in docs[i]:
+                if chunk_id not in chunk_numbers:
+                    chunk_numbers[chunk_id] = len(chunk_numbers) + 1
+                    context_lines.append(f"[C{chunk_numbers[chunk_id]}] {text}")
+                refs.append(f"C{chunk_numbers[chunk_id]}")
+            question_lines.append(f"Q{n} (context: {', '.join(refs) or 'none'}): {questions[i]}")
+
+        prompt = (
+            "You are a patch planning assistant. Based on the following vendor context:\n\n"
+            + "\n\n".join(context_lines)
+            + "\n\nAnswer each question using the context chunks listed with it:\n"
+            + "\n".join(question_lines)
+            + '\n\nRespond with only a JSON object mapping question labels to answers, '
+              'e.g. {"Q1": "...", "Q2": "..."}.'
+        )
+        parsed = parse_json_object(self._llm_call(prompt)) or {}
+        answers = {}
+        for n, i in enumerate(pack, start=1):
+            answer = parsed.get(f"Q{n}")
+            if isinstance(answer, str) and answer.strip():
+                answers[i] = answer.strip()
+        return answers
+
+    def _llm_call(self, full_prompt: str):
+        # Shared pooled client; imported lazily to keep this module cheap to import
+        from agents.llm_gateway import get_llm_gateway
+        return get_llm_gateway().complete(
+            [
                 {"role": "system", "content": "You are a helpful software patching analyst."},
                 {"role": "user", "content": full_prompt}
             ],
+            model=LLM_MODEL,
             temperature=0.3
         )
-        return response.choices[0].message.content.strip()
@@ -0,0 +1,177 @@
+# backend/agents/rate_limiter.py
+
+import asyncio
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+RETRYABLE_ERROR_NAMES = {"APIConnectionError", "APITimeoutError"}
+
+def is_retryable(error: Exception) -> bool:
+    status = getattr(error, "status_code", None)
+    if status is not None:
+        return status in RETRYABLE_STATUS_CODES
+    return type(error).__name__ in RETRYABLE_ERROR_NAMES
+
+def is_rate_limited(error: Exception) -> bool:
+    return getattr(error, "status_code", None) == 429
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Delay requested by the provider via retry-after-ms / Retry-After, if any"""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    value = headers.get("retry-after-ms")
+    if value is not None:
+        try:
+            return float(value) / 1000.0
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+def estimate_tokens(messages: List[Dict[str, str]], completion_tokens: int = 512) -> int:
+    # ~4 characters per token plus room for the reply; corrected with real usage afterwards
+    return sum(len(message.get("content") or "") for message in messages) // 4 + completion_tokens
+
+class AdaptiveRateLimiter:
+    """Paces LLM requests to the highest rate the provider accepts.
+
+    A token bucket admits requests at ``rate`` per second, adjusted AIMD-style:
+    every success adds ``additive_step`` and every 429 multiplies the rate by
+    ``decrease_factor``. An optional second bucket caps tokens per minute.
+    Failed calls are retried with full-jitter exponential backoff, honouring
+    Retry-After when the provider sends it.
+    """
+
+    def __init__(self, initial_rps: float = 2.0, min_rps: float = 0.2, max_rps: float = 20.0,
+                 additive_step: float = 0.05, decrease_factor: float = 0.5,
+                 tokens_per_minute: Optional[int] = None, max_retries: int = 5,
+                 base_delay: float = 1.0, max_delay: float = 60.0):
+        self.rate = initial_rps
+        self.min_rps = min_rps
+        self.max_rps = max_rps
+        self.additive_step = additive_step
+        self.decrease_factor = decrease_factor
+        self.tokens_per_minute = tokens_per_minute
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._lock = threading.Lock()
+        self._request_tokens = 1.0
+        self._llm_tokens = float(tokens_per_minute or 0)
+        self._last_refill = time.monotonic()
+        self.stats = {"requests": 0, "successes": 0, "rate_limited": 0, "retries": 0, "failures": 0}
+
+    def _refill(self, now: float):
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        # Burst capacity of one second's worth of requests
+        self._request_tokens = min(max(1.0, self.rate), self._request_tokens + elapsed * self.rate)
+        if self.tokens_per_minute:
+            self._llm_tokens = min(float(self.tokens_per_minute),
+                                   self._llm_tokens + elapsed * self.tokens_per_minute / 60.0)
+
+    def _reserve(self, tokens: int) -> float:
+        """Take a request slot and return 0, or return how long to wait before trying again"""
+        with self._lock:
+            self._refill(time.monotonic())
+            # A single request larger than the whole budget is admitted once the bucket is full
+            tokens = min(tokens, self.tokens_per_minute) if self.tokens_per_minute else 0
+            waits = []
+            if self._request_tokens < 1.0:
+                waits.append((1.0 - self._request_tokens) / self.rate)
+            if tokens and self._llm_tokens < tokens:
+                waits.append((tokens - self._llm_tokens) * 60.0 / self.tokens_per_minute)
+            if waits:
+                return max(waits)
+            self._request_tokens -= 1.0
+            self._llm_tokens -= tokens
+            self.stats["requests"] += 1
+            return 0.0
+
+    def acquire(self, tokens: int = 0):
+        while True:
+            wait = self._reserve(tokens)
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    async def aacquire(self, tokens: int = 0):
+        while True:
+            wait = self._reserve(tokens)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def on_success(self, estimated_tokens: int = 0, used_tokens: Optional[int] = None):
+        with self._lock:
+            self.rate = min(self.max_rps, self.rate + self.additive_step)
+            self.stats["successes"] += 1
+            if self.tokens_per_minute and used_tokens is not None:
+                self._llm_tokens -= used_tokens - min(estimated_tokens, self.tokens_per_minute)
+
+    def on_rate_limited(self):
+        with self._lock:
+            self.rate = max(self.min_rps, self.rate * self.decrease_factor)
+            self._request_tokens = min(self._request_tokens, 0.0)
+            self.stats["rate_limited"] += 1
+
+    def backoff_delay(self, attempt: int, error: Exception) -> float:
+        retry_after = retry_after_seconds(error)
+        if retry_after is not None:
+            return min(self.max_delay, retry_after) + random.uniform(0, 0.1 * self.base_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def _on_failure(self, attempt: int, error: Exception) -> float:
+        """Record a failed attempt; return the backoff delay, or re-raise if it should not be retried"""
+        if is_rate_limited(error):
+            self.on_rate_limited()
+        if not is_retryable(error) or attempt >= self.max_retries:
+            with self._lock:
+                self.stats["failures"] += 1
+            raise error
+        with self._lock:
+            self.stats["retries"] += 1
+        return self.backoff_delay(attempt, error)
+
+    def call(self, fn: Callable[[], Any], estimated_tokens: int = 0,
+             usage: Callable[[Any], Optional[int]] = lambda result: None) -> Any:
+        attempt = 0
+        while True:
+            self.acquire(estimated_tokens)
+            try:
+                result = fn()
+            except Exception as e:
+                time.sleep(self._on_failure(attempt, e))
+                attempt += 1
+                continue
+            self.on_success(estimated_tokens, usage(result))
+            return result
+
+    async def acall(self, coro_fn: Callable[[], Awaitable[Any]], estimated_tokens: int = 0,
+                    usage: Callable[[Any], Optional[int]] = lambda result: None) -> Any:
+        attempt = 0
+        while True:
+            await self.aacquire(estimated_tokens)
+            try:
+                result = await coro_fn()
+            except Exception as e:
+                await asyncio.sleep(self._on_failure(attempt, e))
+                attempt += 1
+                continue
+            self.on_success(estimated_tokens, usage(result))
+            return result
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {"rate_rps": round(self.rate, 3), **self.stats}
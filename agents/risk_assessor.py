@@ -1,58 +1,315 @@
 # backend/agents/risk_assessor.py
 
 import random
-from typing import List, Dict
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Tuple
+import numpy as np
+from agents.llm_output import parse_json_object
+from agents.risk_rules import DEPENDENCY_LEVELS, RISK_RULES_PATH, ROLLBACK_LEVELS, RiskRuleEngine, RuleSet
+from agents.risk_store import RiskResultStore
+
+# Bump whenever the scoring code changes so stored results are recomputed; rule file edits are tracked by hash
+RULES_VERSION = "2"
 
 class RiskAssessorAgent:
-    def __init__(self, use_llm=False, llm_reasoner=None):
+    def __init__(self, use_llm=False, llm_reasoner=None, batch_size=1, concurrency=1, seed=None,
+                 store: RiskResultStore = None, rules_path: str = RISK_RULES_PATH):
         self.use_llm = use_llm
         self.llm_reasoner = llm_reasoner
+        # Scoring weights and rules come from a hot-reloaded declarative file
+        self.rules = RiskRuleEngine(rules_path)
+        # Optional cross-run memo: unchanged CVEs reuse their stored result
+        self.store = store
+        # CVEs per LLM prompt in assess_all; 1 keeps one free-text call per CVE
+        self.batch_size = batch_size
+        # LLM prompts assess_all keeps in flight at once
+        self.concurrency = concurrency
+        self.last_run_stats: Dict = {}
+        # Every CVE consumes two draws (dependency, then rollback), in feed order, on both scoring paths
+        self._rng = random.Random(seed)
 
     def score_patch(self, cve: Dict) -> Dict:
+        result = self._score(cve)
+        if self.use_llm and self.llm_reasoner:
+            result["llm_reasoning"] = self.llm_reasoner.run(self._risk_prompt(cve, result))
+        return result
+
+    def _draw_level(self) -> int:
+        return int(self._rng.random() * 3)
+
+    def _score(self, cve: Dict, rules: RuleSet = None) -> Dict:
+        rules = rules or self.rules.current()
         severity = cve.get("severity", "").lower()
-        base_score = {
-            "critical": 90,
-            "high": 75,
-            "medium": 50,
-            "low": 30
-        }.get(severity, 10)
+        base_score = rules.base_score(severity)
 
         # Mocked logic for extra weights
-        dependency_risk = random.choice(["low", "medium", "high"])
-        rollback_difficulty = random.choice(["easy", "moderate", "hard"])
+        dependency = self._draw_level()
+        rollback = self._draw_level()
+        score = rules.clamp(
+            base_score
+            + rules.dependency_weights[dependency]
+            + rules.rollback_weights[rollback]
+            + rules.adjustment(cve)
+        )
 
-        if dependency_risk == "high":
-            base_score += 10
-        elif dependency_risk == "medium":
-            base_score += 5
+        return {
+            "cve_id": cve.get("id"),
+            "severity": severity,
+            "risk_score": score,
+            "dependency_risk": DEPENDENCY_LEVELS[dependency],
+            "rollback_difficulty": ROLLBACK_LEVELS[rollback],
+            "llm_reasoning": ""
+        }
 
-        if rollback_difficulty == "hard":
-            base_score += 5
-        elif rollback_difficulty == "moderate":
-            base_score += 2
+    def score_columns(self, cves: List[Dict], rules: RuleSet = None) -> Dict[str, np.ndarray]:
+        """Score a whole feed at once as NumPy columns.
 
-        score = min(base_score, 100)
+        Consumes the random stream exactly like calling _score on each CVE in order,
+        so both paths give identical results for the same seed.
+        """
+        rules = rules or self.rules.current()
+        n = len(cves)
+        severities = [cve.get("severity", "").lower() for cve in cves]
+        severity_codes = np.fromiter((rules.severity_codes.get(s, -1) for s in severities), dtype=np.int16, count=n)
+        draws = np.fromiter((self._rng.random() for _ in range(2 * n)), dtype=np.float64, count=2 * n)
+        levels = (draws * 3).astype(np.int8).reshape(n, 2)
+        dependency_codes, rollback_codes = levels[:, 0], levels[:, 1]
+        scores = np.clip(
+            rules.base_score_column[severity_codes]
+            + rules.dependency_weight_column[dependency_codes]
+            + rules.rollback_weight_column[rollback_codes]
+            + rules.adjustment_column(cves),
+            rules.min_score, rules.max_score
+        )
+        return {
+            "cve_id": np.array([cve.get("id") for cve in cves], dtype=object),
+            "severity": np.array(severities, dtype=object),
+            "severity_code": severity_codes,
+            "dependency_code": dependency_codes,
+            "rollback_code": rollback_codes,
+            "risk_score": scores
+        }
 
-        llm_reasoning = ""
-        if self.use_llm and self.llm_reasoner:
-            prompt = (
-                f"Evaluate this CVE for patch risk:\n"
-                f"ID: {cve.get('id')}\n"
-                f"Description: {cve.get('description')}\n"
-                f"Severity: {severity}\n"
-                f"Dependency Risk: {dependency_risk}\n"
-                f"Rollback Difficulty: {rollback_difficulty}\n"
+    def score_all(self, cves: List[Dict], rules: RuleSet = None) -> List[Dict]:
+        """Columnar equivalent of [self._score(cve) for cve in cves]"""
+        columns = self.score_columns(cves, rules)
+        return [
+            {
+                "cve_id": cve_id,
+                "severity": severity,
+                "risk_score": score,
+                "dependency_risk": DEPENDENCY_LEVELS[dependency],
+                "rollback_difficulty": ROLLBACK_LEVELS[rollback],
+                "llm_reasoning": ""
+            }
+            for cve_id, severity, score, dependency, rollback in zip(
+                columns["cve_id"].tolist(), columns["severity"].tolist(), columns["risk_score"].tolist(),
+                columns["dependency_code"].tolist(), columns["rollback_code"].tolist()
             )
-            llm_reasoning = self.llm_reasoner.run(prompt)
+        ]
 
-        return {
-            "cve_id": cve.get("id"),
-            "severity": severity,
-            "risk_score": score,
-            "dependency_risk": dependency_risk,
-            "rollback_difficulty": rollback_difficulty,
-            "llm_reasoning": llm_reasoning
+    def _cve_details(self, cve: Dict, result: Dict) -> str:
+        return (
+            f"ID: {cve.get('id')}\n"
+            f"Description: {cve.get('description')}\n"
+            f"Severity: {result['severity']}\n"
+            f"Dependency Risk: {result['dependency_risk']}\n"
+            f"Rollback Difficulty: {result['rollback_difficulty']}\n"
+        )
+
+    def _risk_prompt(self, cve: Dict, result: Dict) -> str:
+        return "Evaluate this CVE for patch risk:\n" + self._cve_details(cve, result)
+
+    def _batch_prompt(self, cves: List[Dict], results: List[Dict]) -> str:
+        details = "\n".join(self._cve_details(cve, result) for cve, result in zip(cves, results))
+        return (
+            "Evaluate each of these CVEs for patch risk:\n\n"
+            + details
+            + '\nRespond with only a JSON object mapping each CVE ID to your evaluation of it as a string, '
+              'e.g. {"CVE-2024-0001": "..."}.'
+        )
+
+    def assess_all(self, cves: List[Dict], batch_size: int = None, concurrency: int = None) -> List[Dict]:
+        """Score every CVE, returning results in feed order.
+
+        A CVE that fails is reported with an ``error`` field instead of aborting the
+        run. With a store, CVEs whose scoring inputs are unchanged since the last
+        run reuse their stored result. Per-CVE timings and failures are kept in
+        ``last_run_stats``.
+        """
+        batch_size = batch_size or self.batch_size
+        concurrency = concurrency or self.concurrency
+        started = time.perf_counter()
+        # One compiled rule set for the whole run, even if the file is edited meanwhile
+        rules = self.rules.current()
+
+        stored, hashes = self._lookup_stored(cves, rules)
+        pending = [i for i in range(len(cves)) if i not in stored]
+        lookup_share = (time.perf_counter() - started) / len(cves) if cves else 0.0
+
+        fresh, fresh_seconds, fresh_errors, llm_units = self._assess_fresh(
+            [cves[i] for i in pending], batch_size, concurrency, rules
+        )
+        results = [stored.get(i) for i in range(len(cves))]
+        seconds = [lookup_share] * len(cves)
+        errors: Dict[int, str] = {}
+        for j, i in enumerate(pending):
+            results[i] = fresh[j]
+            seconds[i] += fresh_seconds[j]
+            if j in fresh_errors:
+                errors[i] = fresh_errors[j]
+
+        if self.store is not None:
+            self.store.put_many([
+                (results[i]["cve_id"], hashes[i], results[i])
+                for i in pending if i in hashes and i not in errors
+                and not results[i].get("llm_reasoning", "").startswith("[LLM Error]")
+            ])
+
+        self.last_run_stats = {
+            "total": len(cves),
+            "reused": len(stored),
+            "recomputed": len(pending),
+            "failed": len(errors),
+            "llm_calls_planned": llm_units,
+            "batch_size": batch_size,
+            "concurrency": concurrency,
+            "wall_seconds": round(time.perf_counter() - started, 4),
+            "per_cve": [
+                {"cve_id": result.get("cve_id"), "seconds": round(seconds[i], 4),
+                 **({"reused": True} if i in stored else {}),
+                 **({"error": errors[i]} if i in errors else {})}
+                for i, result in enumerate(results)
+            ]
         }
+        return results
+
+    def assess_stream(self, cves: Iterable[Dict], chunk_size: int = 1000, batch_size: int = None,
+                      concurrency: int = None) -> Iterator[Dict]:
+        """Assess an iterator of CVEs chunk by chunk, yielding results in feed order.
+
+        Only one chunk of raw CVE records is held at a time. ``last_run_stats``
+        covers the whole stream once it is exhausted.
+        """
+        records = iter(cves)
+        totals: Dict = {}
+        per_cve: List[Dict] = []
+        while True:
+            chunk = list(islice(records, chunk_size))
+            if not chunk:
+                break
+            yield from self.assess_all(chunk, batch_size, concurrency)
+            for key, value in self.last_run_stats.items():
+                if key == "per_cve":
+                    per_cve.extend(value)
+                elif key in ("batch_size", "concurrency"):
+                    totals[key] = value
+                else:
+                    totals[key] = totals.get(key, 0) + value
+        self.last_run_stats = {**totals, "per_cve": per_cve}
+
+    def _input_hash(self, cve: Dict, rules: RuleSet) -> str:
+        model = self.llm_reasoner.model if self.use_llm and self.llm_reasoner else None
+        # Fields the rules test are scoring inputs too
+        rule_inputs = [cve.get(field) for field in rules.fields]
+        return RiskResultStore.input_hash(
+            [cve.get("description"), cve.get("severity"), rule_inputs, RULES_VERSION, rules.version, model]
+        )
+
+    def _lookup_stored(self, cves: List[Dict], rules: RuleSet) -> Tuple[Dict[int, Dict], Dict[int, str]]:
+        """Stored results by feed index, plus the input hash of every storable CVE"""
+        if self.store is None:
+            return {}, {}
+        ids = [cve.get("id") if isinstance(cve, dict) else None for cve in cves]
+        # Duplicate IDs in one feed would overwrite each other's row, so they are never stored
+        counts: Dict[str, int] = {}
+        for cve_id in ids:
+            counts[cve_id] = counts.get(cve_id, 0) + 1
+        hashes = {i: self._input_hash(cve, rules) for i, cve in enumerate(cves)
+                  if ids[i] and counts[ids[i]] == 1}
+        found = self.store.get_many({ids[i]: input_hash for i, input_hash in hashes.items()})
+        return {i: found[ids[i]] for i in hashes if ids[i] in found}, hashes
+
+    def _assess_fresh(self, cves: List[Dict], batch_size: int, concurrency: int,
+                      rules: RuleSet) -> Tuple[List[Dict], List[float], Dict[int, str], int]:
+        seconds = [0.0] * len(cves)
+        errors: Dict[int, str] = {}
+
+        # Scores are drawn serially in feed order, so batching and concurrency never change them
+        results = self._score_feed(cves, seconds, errors, rules)
+
+        units = []
+        if self.use_llm and self.llm_reasoner:
+            scored = [i for i in range(len(cves)) if i not in errors]
+            step = max(1, batch_size)
+            units = [scored[start:start + step] for start in range(0, len(scored), step)]
+
+        def reason(unit: List[int]):
+            unit_started = time.perf_counter()
+            try:
+                if len(unit) == 1:
+                    results[unit[0]]["llm_reasoning"] = self.llm_reasoner.run(
+                        self._risk_prompt(cves[unit[0]], results[unit[0]])
+                    )
+                else:
+                    self._reason_batch([cves[i] for i in unit], [results[i] for i in unit])
+            except Exception as e:
+                for i in unit:
+                    errors[i] = str(e)
+                    results[i]["llm_reasoning"] = f"[LLM Error]: {str(e)}"
+            # A batched prompt's latency is shared evenly by its CVEs
+            for i in unit:
+                seconds[i] += (time.perf_counter() - unit_started) / len(unit)
+
+        if concurrency > 1 and len(units) > 1:
+            with ThreadPoolExecutor(max_workers=min(concurrency, len(units))) as pool:
+                list(pool.map(reason, units))
+        else:
+            for unit in units:
+                reason(unit)
+
+        return results, seconds, errors, len(units)
+
+    def _score_feed(self, cves: List[Dict], seconds: List[float], errors: Dict[int, str],
+                    rules: RuleSet) -> List[Dict]:
+        # A malformed CVE would abort the columnar pass, so only well-formed feeds take it
+        if all(isinstance(cve, dict) and isinstance(cve.get("severity", ""), str) for cve in cves):
+            started = time.perf_counter()
+            results = self.score_all(cves, rules)
+            if cves:
+                share = (time.perf_counter() - started) / len(cves)
+                seconds[:] = [share] * len(cves)
+            return results
+
+        results = []
+        for i, cve in enumerate(cves):
+            item_started = time.perf_counter()
+            try:
+                results.append(self._score(cve, rules))
+            except Exception as e:
+                errors[i] = str(e)
+                results.append({"cve_id": cve.get("id") if isinstance(cve, dict) else None, "error": str(e)})
+            seconds[i] = time.perf_counter() - item_started
+        return results
+
+    def _reason_batch(self, cves: List[Dict], results: List[Dict]):
+        """Fill llm_reasoning for one batch from a single JSON reply, falling back per CVE"""
+        ids = [cve.get("id") for cve in cves]
+        # Only CVEs with a unique ID can be matched back to the JSON reply
+        keyed = [i for i, cve_id in enumerate(ids) if cve_id and ids.count(cve_id) == 1]
+        answers = {}
+        if len(keyed) > 1:
+            reply = self.llm_reasoner.run(
+                self._batch_prompt([cves[i] for i in keyed], [results[i] for i in keyed]),
+                json_mode=True
+            )
+            answers = parse_json_object(reply) or {}
 
-    def assess_all(self, cves: List[Dict]) -> List[Dict]:
-        return [self.score_patch(cve) for cve in cves]
+        for i, (cve, result) in enumerate(zip(cves, results)):
+            answer = answers.get(ids[i]) if i in keyed else None
+            if isinstance(answer, str) and answer.strip():
+                result["llm_reasoning"] = answer.strip()
+            else:
+                result["llm_reasoning"] = self.llm_reasoner.run(self._risk_prompt(cve, result))
@@ -0,0 +1,205 @@
+# backend/agents/risk_rules.py
+
+import hashlib
+import json
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import numpy as np
+
+RISK_RULES_PATH = "backend/data/risk_rules.json"
+
+# Levels of the mocked per-CVE factors, in the order their random draws index them
+DEPENDENCY_LEVELS = ["low", "medium", "high"]
+ROLLBACK_LEVELS = ["easy", "moderate", "hard"]
+
+# Used when no rule file exists; reproduces the original hard-coded weights
+DEFAULT_RULES = {
+    "severity_scores": {"critical": 90, "high": 75, "medium": 50, "low": 30},
+    "unknown_severity_score": 10,
+    "dependency_weights": {"low": 0, "medium": 5, "high": 10},
+    "rollback_weights": {"easy": 0, "moderate": 2, "hard": 5},
+    "max_score": 100,
+    "rules": []
+}
+
+def normalize_field(value: Any) -> str:
+    """Lower-cased text form of a CVE field; lists become one entry per line"""
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        return "\n".join(str(item).lower() for item in value)
+    return str(value).lower()
+
+def _hashable(value: Any) -> Any:
+    # Containers are keyed by their normalised text, which is all a predicate ever sees
+    return normalize_field(value) if isinstance(value, (list, tuple, dict, set)) else value
+
+def _compile_condition(condition: Dict) -> Callable[[str], bool]:
+    op = condition.get("op", "contains_any")
+    if op == "exists":
+        return bool
+    if op == "equals":
+        expected = str(condition["value"]).lower()
+        return lambda value: value == expected
+    if op == "in":
+        allowed = frozenset(str(v).lower() for v in condition["values"])
+        return lambda value: value in allowed
+    if op == "contains_any":
+        keywords = sorted((str(v).lower() for v in condition["values"]), key=len, reverse=True)
+        search = re.compile("|".join(re.escape(k) for k in keywords)).search
+        return lambda value: search(value) is not None
+    if op == "matches":
+        search = re.compile(condition["pattern"], re.IGNORECASE).search
+        return lambda value: search(value) is not None
+    raise ValueError(f"Unknown rule operator: {op}")
+
+class RuleSet:
+    """A rule file compiled into per-field predicate tables.
+
+    Each rule adds ``weight`` to the score when all of its conditions hold.
+    Conditions are grouped by the CVE field they test, so each field is read and
+    normalised once per CVE however many rules use it. A rule is skipped as soon
+    as one of its conditions fails.
+    """
+
+    def __init__(self, spec: Dict, version: str):
+        self.version = version
+        severity_scores = spec.get("severity_scores", DEFAULT_RULES["severity_scores"])
+        self.severity_levels = list(severity_scores)
+        self.severity_codes = {level: code for code, level in enumerate(self.severity_levels)}
+        self.unknown_severity_score = int(spec.get("unknown_severity_score", DEFAULT_RULES["unknown_severity_score"]))
+        self.max_score = int(spec.get("max_score", DEFAULT_RULES["max_score"]))
+        self.min_score = int(spec.get("min_score", 0))
+        dependency = spec.get("dependency_weights", DEFAULT_RULES["dependency_weights"])
+        rollback = spec.get("rollback_weights", DEFAULT_RULES["rollback_weights"])
+        self.dependency_weights = [int(dependency.get(level, 0)) for level in DEPENDENCY_LEVELS]
+        self.rollback_weights = [int(rollback.get(level, 0)) for level in ROLLBACK_LEVELS]
+
+        # Indexed by severity code; the extra last slot serves unknown severities (code -1)
+        self.base_score_column = np.array(
+            [int(severity_scores[level]) for level in self.severity_levels] + [self.unknown_severity_score],
+            dtype=np.int32
+        )
+        self.dependency_weight_column = np.array(self.dependency_weights, dtype=np.int32)
+        self.rollback_weight_column = np.array(self.rollback_weights, dtype=np.int32)
+
+        self.rule_names: List[str] = []
+        weights = []
+        self.by_field: Dict[str, List[Tuple[int, Callable[[str], bool]]]] = {}
+        for rule in spec.get("rules", []):
+            if not rule.get("enabled", True):
+                continue
+            name = rule.get("name", f"rule-{len(self.rule_names) + 1}")
+            conditions = rule.get("when", [])
+            if not conditions:
+                raise ValueError(f"Rule {name!r} has no conditions")
+            index = len(self.rule_names)
+            for condition in conditions:
+                try:
+                    predicate = _compile_condition(condition)
+                    field = condition["field"]
+                except (KeyError, re.error, ValueError) as e:
+                    raise ValueError(f"Invalid condition in rule {name!r}: {e}") from e
+                self.by_field.setdefault(field, []).append((index, predicate))
+            self.rule_names.append(name)
+            weights.append(int(rule.get("weight", 0)))
+        self.rule_weights = np.array(weights, dtype=np.int32)
+        self.fields = tuple(self.by_field)
+
+    @property
+    def rule_count(self) -> int:
+        return len(self.rule_names)
+
+    def base_score(self, severity: str) -> int:
+        code = self.severity_codes.get(severity)
+        return int(self.base_score_column[code]) if code is not None else self.unknown_severity_score
+
+    def matched_rules(self, cve: Dict) -> List[int]:
+        alive = [True] * len(self.rule_names)
+        for field, predicates in self.by_field.items():
+            value = normalize_field(cve.get(field))
+            for index, predicate in predicates:
+                if alive[index] and not predicate(value):
+                    alive[index] = False
+        return [index for index, matched in enumerate(alive) if matched]
+
+    def adjustment(self, cve: Dict) -> int:
+        return sum(int(self.rule_weights[index]) for index in self.matched_rules(cve))
+
+    def match_matrix(self, cves: List[Dict]) -> np.ndarray:
+        """Boolean (len(cves), rule_count) matrix of rule matches for a whole feed"""
+        matches = np.ones((len(cves), len(self.rule_names)), dtype=bool)
+        for field, predicates in self.by_field.items():
+            # Fields such as severity or exposure repeat heavily; test each distinct value once
+            codes: Dict[Any, int] = {}
+            inverse = np.fromiter(
+                (codes.setdefault(_hashable(cve.get(field)), len(codes)) for cve in cves),
+                dtype=np.int64, count=len(cves)
+            )
+            distinct = [normalize_field(value) for value in codes]
+            for index, predicate in predicates:
+                hits = np.fromiter((predicate(value) for value in distinct), dtype=bool, count=len(distinct))
+                matches[:, index] &= hits[inverse]
+        return matches
+
+    def adjustment_column(self, cves: List[Dict]) -> np.ndarray:
+        if not self.rule_names:
+            return np.zeros(len(cves), dtype=np.int32)
+        return self.match_matrix(cves).astype(np.int32) @ self.rule_weights
+
+    def clamp(self, score: int) -> int:
+        return max(self.min_score, min(score, self.max_score))
+
+class RiskRuleEngine:
+    """Loads the rule file and recompiles it whenever its modification time changes.
+
+    ``current()`` returns the compiled RuleSet for the file as it is now. If a
+    reload fails (for example a half-written file), the previous rules stay in
+    effect. A missing file falls back to DEFAULT_RULES.
+    """
+
+    def __init__(self, rules_path: str = RISK_RULES_PATH):
+        self.rules_path = Path(rules_path)
+        self._lock = threading.Lock()
+        self._mtime: Optional[int] = None
+        self._ruleset: Optional[RuleSet] = None
+        self.reloads = 0
+
+    @staticmethod
+    def compile(spec: Dict) -> RuleSet:
+        canonical = json.dumps(spec, sort_keys=True, separators=(",", ":"))
+        return RuleSet(spec, hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16])
+
+    def _stat_mtime(self) -> Optional[int]:
+        try:
+            return os.stat(self.rules_path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def current(self) -> RuleSet:
+        mtime = self._stat_mtime()
+        if self._ruleset is not None and mtime == self._mtime:
+            return self._ruleset
+        with self._lock:
+            if self._ruleset is not None and mtime == self._mtime:
+                return self._ruleset
+            try:
+                if mtime is None:
+                    ruleset = self.compile(DEFAULT_RULES)
+                else:
+                    with open(self.rules_path, "r") as f:
+                        ruleset = self.compile(json.load(f))
+            except (OSError, TypeError, ValueError) as e:
+                if self._ruleset is None:
+                    raise
+                print(f"[RiskRuleEngine] Keeping previous rules, failed to reload {self.rules_path}: {e}")
+                self._mtime = mtime
+                return self._ruleset
+            if self._ruleset is not None:
+                self.reloads += 1
+                print(f"[RiskRuleEngine] Reloaded {ruleset.rule_count} rules (version {ruleset.version})")
+            self._ruleset, self._mtime = ruleset, mtime
+            return ruleset
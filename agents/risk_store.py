@@ -0,0 +1,74 @@
+# backend/agents/risk_store.py
+
+import hashlib
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+RISK_STORE_PATH = "backend/data/risk_results.sqlite3"
+
+# SQLite caps bound parameters per statement; stay well below the oldest default (999)
+_QUERY_CHUNK = 500
+
+class RiskResultStore:
+    """Persistent per-CVE risk results, reused while the scoring inputs are unchanged.
+
+    Each row holds the latest result for a CVE ID together with the hash of the
+    inputs that produced it. A lookup only returns results whose stored hash
+    matches, so edited CVEs, new rules or a different model are recomputed.
+    """
+
+    def __init__(self, db_path: str = RISK_STORE_PATH):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS risk_results ("
+                "cve_id TEXT PRIMARY KEY, input_hash TEXT NOT NULL, "
+                "result TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    @staticmethod
+    def input_hash(inputs: Iterable) -> str:
+        payload = json.dumps(list(inputs), sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get_many(self, hashes: Dict[str, str]) -> Dict[str, Dict]:
+        """Stored results for the CVE IDs in hashes whose input hash still matches"""
+        found = {}
+        cve_ids = list(hashes)
+        with self._connect() as conn:
+            for start in range(0, len(cve_ids), _QUERY_CHUNK):
+                chunk = cve_ids[start:start + _QUERY_CHUNK]
+                rows = conn.execute(
+                    f"SELECT cve_id, input_hash, result FROM risk_results "
+                    f"WHERE cve_id IN ({','.join('?' * len(chunk))})",
+                    chunk
+                )
+                for cve_id, input_hash, result in rows:
+                    if hashes[cve_id] == input_hash:
+                        found[cve_id] = json.loads(result)
+        return found
+
+    def put_many(self, rows: List[Tuple[str, str, Dict]]):
+        """Store (cve_id, input_hash, result) rows, replacing older results for the same CVE"""
+        now = time.time()
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO risk_results (cve_id, input_hash, result, updated_at) "
+                "VALUES (?, ?, ?, ?)",
+                [(cve_id, input_hash, json.dumps(result), now) for cve_id, input_hash, result in rows]
+            )
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM risk_results")
+
+    def stats(self) -> Dict:
+        with self._connect() as conn:
+            return {"entries": conn.execute("SELECT COUNT(*) FROM risk_results").fetchone()[0]}
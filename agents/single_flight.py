@@ -0,0 +1,74 @@
+# backend/agents/single_flight.py
+
+import asyncio
+import threading
+import weakref
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key into one execution.
+
+    ``do`` serves threads: the first caller runs the function and later callers
+    block on its result. ``ado`` serves asyncio tasks the same way within an event
+    loop, and also joins a call already in flight on a worker thread. Exceptions
+    propagate to every waiter.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+        self._tasks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Task]]" = weakref.WeakKeyDictionary()
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+                self.executed += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    async def ado(self, key: str, coro_fn: Callable[[], Awaitable[Any]]) -> Any:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            thread_future = self._calls.get(key)
+            tasks = self._tasks.setdefault(loop, {})
+            task = tasks.get(key)
+            if thread_future is not None or task is not None:
+                self.coalesced += 1
+            else:
+                task = loop.create_task(coro_fn())
+                tasks[key] = task
+                task.add_done_callback(lambda _: tasks.pop(key, None))
+                self.executed += 1
+        if thread_future is not None:
+            return await asyncio.wrap_future(thread_future)
+        # shield: a cancelled waiter must not cancel the call the others are waiting on
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "executed": self.executed,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._calls) + sum(len(tasks) for tasks in self._tasks.values())
+            }
@@ -0,0 +1,103 @@
+# backend/agents/sqlite_cache.py
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+class SQLiteLRUCache:
+    """SQLite-backed cache of text responses with LRU and TTL eviction.
+
+    Entries older than ``ttl_seconds`` are dropped, and once there are more than
+    ``max_entries`` the least recently used go first. Every entry also records a
+    tag, stored in the subclass's ``tag_column``, that says what produced it
+    (a corpus version, a model). ``invalidate`` drops entries by tag.
+    """
+
+    table = "cache"
+    tag_column = "tag"
+
+    def __init__(self, db_path: str, max_entries: int, ttl_seconds: int):
+        self.db_path = Path(db_path)
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                f"key TEXT PRIMARY KEY, {self.tag_column} TEXT NOT NULL, response TEXT NOT NULL, "
+                f"created_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{self.table}_access ON {self.table} (last_access)")
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    @staticmethod
+    def hash_key(*parts) -> str:
+        payload = json.dumps(list(parts))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _count(self, hit: bool):
+        with self._stats_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(f"SELECT response, created_at FROM {self.table} WHERE key = ?", (key,)).fetchone()
+            if row is not None and now - row[1] > self.ttl_seconds:
+                conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                row = None
+            if row is not None:
+                conn.execute(f"UPDATE {self.table} SET last_access = ? WHERE key = ?", (now, key))
+        self._count(row is not None)
+        return row[0] if row is not None else None
+
+    def put(self, key: str, tag: str, response: str):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, {self.tag_column}, response, created_at, last_access) "
+                f"VALUES (?, ?, ?, ?, ?)",
+                (key, tag, response, now, now)
+            )
+            conn.execute(f"DELETE FROM {self.table} WHERE created_at < ?", (now - self.ttl_seconds,))
+            conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN ("
+                f"SELECT key FROM {self.table} ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+    def invalidate(self, keep_tag: str = None) -> int:
+        """Drop every entry not tagged ``keep_tag`` (all entries if None)"""
+        with self._connect() as conn:
+            if keep_tag is None:
+                cursor = conn.execute(f"DELETE FROM {self.table}")
+            else:
+                cursor = conn.execute(f"DELETE FROM {self.table} WHERE {self.tag_column} != ?", (keep_tag,))
+            return cursor.rowcount
+
+    def clear(self):
+        self.invalidate()
+
+    def stats(self) -> Dict:
+        with self._connect() as conn:
+            entries = conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+        with self._stats_lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+            }
@@ -0,0 +1,131 @@
+# backend/agents/vector_backends.py
+
+import json
+import sqlite3
+from typing import Dict, Iterator, List, Tuple
+
+CHROMA_PATH = "backend/rag_store/chromadb"
+FLAT_INDEX_PATH = "backend/rag_store/flat_index"
+HNSW_INDEX_PATH = "backend/rag_store/hnsw_index"
+
+# SQLite caps bound parameters per statement; stay well below the oldest default (999)
+_SQL_BATCH = 500
+
+class ChunkTable:
+    """SQLite table of chunk ids, texts and metadata for the local vector backends.
+
+    Rows are keyed by the integer position of the chunk's vector (a matrix row for
+    the flat index, a graph label for HNSW), named by ``key``. Writes are not
+    committed here; each backend commits when its vector files are consistent
+    with the table.
+    """
+
+    def __init__(self, db_path, key: str):
+        self.key = key
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute(
+            f"CREATE TABLE IF NOT EXISTS chunks ("
+            f"{key} INTEGER PRIMARY KEY, chunk_id TEXT UNIQUE NOT NULL, text TEXT NOT NULL, metadata TEXT NOT NULL)"
+        )
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+    def _select(self, columns: str, column: str, values: List) -> Iterator[Tuple]:
+        for start in range(0, len(values), _SQL_BATCH):
+            batch = values[start:start + _SQL_BATCH]
+            yield from self.conn.execute(
+                f"SELECT {columns} FROM chunks WHERE {column} IN ({','.join('?' * len(batch))})", batch
+            )
+
+    def keys_for(self, ids: List[str]) -> Dict[str, int]:
+        return dict(self._select(f"chunk_id, {self.key}", "chunk_id", list(ids)))
+
+    def texts_for(self, keys: List[int]) -> Dict[int, Tuple[str, str]]:
+        rows = self._select(f"{self.key}, chunk_id, text", self.key, keys)
+        return {key: (chunk_id, text) for key, chunk_id, text in rows}
+
+    def get(self, ids: List[str]) -> List[Dict]:
+        found = {
+            chunk_id: {"chunk_id": chunk_id, "text": text, "metadata": json.loads(metadata)}
+            for chunk_id, text, metadata in self._select("chunk_id, text, metadata", "chunk_id", list(ids))
+        }
+        return [found[chunk_id] for chunk_id in ids if chunk_id in found]
+
+    def insert(self, keys, ids: List[str], texts: List[str], metadatas: List[Dict]):
+        self.conn.executemany(
+            f"INSERT INTO chunks ({self.key}, chunk_id, text, metadata) VALUES (?, ?, ?, ?)",
+            [(int(key), chunk_id, text, json.dumps(metadata))
+             for key, chunk_id, text, metadata in zip(keys, ids, texts, metadatas)]
+        )
+
+    def delete_keys(self, keys: List[int]):
+        for start in range(0, len(keys), _SQL_BATCH):
+            batch = keys[start:start + _SQL_BATCH]
+            self.conn.execute(f"DELETE FROM chunks WHERE {self.key} IN ({','.join('?' * len(batch))})", batch)
+
+    def clear(self):
+        self.conn.execute("DELETE FROM chunks")
+
+    def commit(self):
+        self.conn.commit()
+
+class ChromaBackend:
+    """Persistent Chroma collection holding pre-computed chunk embeddings"""
+
+    def __init__(self, persist_directory: str = CHROMA_PATH):
+        self.persist_directory = persist_directory
+        self._store = None
+
+    @property
+    def store(self):
+        if self._store is None:
+            from langchain_community.vectorstores import Chroma
+            # Embeddings always come from the ingestion pipeline or the caller,
+            # so Chroma never needs to load a model of its own
+            self._store = Chroma(persist_directory=self.persist_directory, embedding_function=None)
+        return self._store
+
+    def upsert(self, ids: List[str], embeddings: List[List[float]], texts: List[str], metadatas: List[Dict]):
+        self.store._collection.upsert(ids=ids, embeddings=embeddings, documents=texts, metadatas=metadatas)
+
+    def delete(self, ids: List[str]):
+        if ids:
+            self.store.delete(ids=ids)
+
+    def get(self, ids: List[str]) -> List[Dict]:
+        result = self.store._collection.get(ids=ids, include=["documents", "metadatas"])
+        return [
+            {"chunk_id": chunk_id, "text": text, "metadata": metadata}
+            for chunk_id, text, metadata in zip(result["ids"], result["documents"], result["metadatas"])
+        ]
+
+    def search(self, query_embeddings: List[List[float]], top_k: int) -> List[List[Tuple[str, str]]]:
+        result = self.store._collection.query(
+            query_embeddings=query_embeddings, n_results=top_k, include=["documents"]
+        )
+        return [list(zip(ids, documents)) for ids, documents in zip(result["ids"], result["documents"])]
+
+    def reset(self):
+        self.store.delete_collection()
+        self._store = None
+
+    def persist(self):
+        self.store.persist()
+
+def create_vector_backend(name: str = "chroma", **options):
+    """Build a vector-store backend by name.
+
+    "chroma" is the persistent Chroma store, "flat" a memory-mapped NumPy matrix
+    with exact search and "hnsw" a shared, once-per-process HNSW graph snapshot.
+    """
+    if name == "chroma":
+        return ChromaBackend(**options)
+    if name == "flat":
+        # Imported here so NumPy is only loaded when the flat backend is selected
+        from agents.flat_index import FlatIndexBackend
+        return FlatIndexBackend(**options)
+    if name == "hnsw":
+        from agents.hnsw_index import HNSWBackend
+        return HNSWBackend.shared(**options)
+    raise ValueError(f"Unknown vector backend: {name}")
@@ -17,6 +17,9 @@ from agents.human_approval_agent import HumanApprovalAgent
 from agents.explainer_agent import ExplainerAgent
 from agents.audit_logger_agent import AuditLoggerAgent
 from routers.execution_router import router as execution_router
+from routers.cve_router import router as cve_router
+from agents.embedding_registry import warm_up as warm_up_embeddings
+from agents.hedging import get_default_hedging_policy
 
 app = FastAPI(
     title="Agentic Patch Management System",
@@ -47,6 +50,19 @@ audit_logger = AuditLoggerAgent()
 app.include_router(approval_router)
 app.include_router(explanation_router)
 app.include_router(execution_router)
+app.include_router(cve_router)
+
+# Optionally load the RAG embedding model before the first request
+@app.on_event("startup")
+async def warm_up_rag_models():
+    if os.getenv("RAG_WARMUP_EMBEDDINGS", "false").lower() in ("1", "true", "yes"):
+        models = warm_up_embeddings()
+        print(f"✅ Embedding models warmed up: {models}")
+    # Load the vendor-note HNSW snapshot once per worker instead of on the first query
+    if os.getenv("RAG_PRELOAD_HNSW", "false").lower() in ("1", "true", "yes"):
+        from agents.hnsw_index import HNSWBackend
+        backend = HNSWBackend.shared()
+        print(f"✅ HNSW vendor-note snapshot loaded: {len(backend)} chunks")
 
 # Existing Pydantic model
 class PatchPlan(BaseModel):
@@ -107,6 +123,9 @@ async def get_system_status():
             mongodb_status = "connected"
         except:
             mongodb_status = "disconnected"
+
+        # Process-wide policy; hedged calls come from the explanation router's own agent
+        hedging_policy = get_default_hedging_policy()
         
         return {
             "status": "healthy",
@@ -118,7 +137,11 @@ async def get_system_status():
             },
             "statistics": {
                 "approvals": approval_stats,
-                "recent_decisions": audit_stats
+                "recent_decisions": audit_stats,
+                "llm_cache": explainer_agent.llm_reasoner.cache_stats(),
+                "llm_coalescing": explainer_agent.llm_reasoner.coalescing_stats(),
+                "llm_rate_limit": explainer_agent.llm_reasoner.gateway.rate_limiter.snapshot(),
+                "llm_hedging": hedging_policy.snapshot() if hedging_policy else None
             },
             "database": {
                 "mongodb": mongodb_status
@@ -1,8 +1,10 @@
 # backend/orchestrator/patch_plan_generator.py - Enhanced for Phase 3
 
 from agents.patch_planner import PatchPlannerAgent
+from agents.cve_store import CVEStore
 from agents.rag_retriever import RAGRetrieverAgent
 from agents.risk_assessor import RiskAssessorAgent
+from agents.risk_store import RiskResultStore
 from agents.llm_reasoner import LLMReasoningAgent
 from agents.patch_scheduler import PatchSchedulerAgent
 from agents.auditor import AuditorAgent
@@ -14,15 +16,18 @@ from agents.patch_executor import PatchExecutor  # Add with other imports
 from datetime import datetime  # Add with other imports
 
 class PatchPlanGenerator:
-    def __init__(self, use_llm=False, deploy_mode = 'dry-run'):
+    def __init__(self, use_llm=False, deploy_mode = 'dry-run', delta_ingestion=False, batch_size=1, concurrency=1):
         self.planner = PatchPlannerAgent(
             cve_file_path="backend/data/mock_cves.json",
-            vendor_notes_dir="backend/data/vendor_notes"
+            vendor_notes_dir="backend/data/vendor_notes",
+            cve_store=CVEStore()
         )
         self.rag = RAGRetrieverAgent(vendor_notes_dir="backend/data/vendor_notes")
         self.use_llm = use_llm
         self.llm_reasoner = LLMReasoningAgent() if use_llm else None
-        self.assessor = RiskAssessorAgent(use_llm=use_llm, llm_reasoner=self.llm_reasoner)
+        # Batched JSON reasoning (batch_size > 1) and concurrent LLM calls (concurrency > 1) are opt-in
+        self.assessor = RiskAssessorAgent(use_llm=use_llm, llm_reasoner=self.llm_reasoner,
+                                          batch_size=batch_size, concurrency=concurrency, store=RiskResultStore())
         
         # Phase 2 agents
         self.scheduler = PatchSchedulerAgent()
@@ -33,19 +38,30 @@ class PatchPlanGenerator:
         self.explainer_agent = ExplainerAgent()
         self.audit_logger = AuditLoggerAgent()
         self.deploy_mode = deploy_mode
+        # Only plan CVEs that are new or changed since the last successful plan
+        self.delta_ingestion = delta_ingestion
         if deploy_mode == 'production':
             self.executor = PatchExecutor()  # Add this line
 
-    def generate_patch_plan(self, create_approval_request=False):
+    def generate_patch_plan(self, create_approval_request=False, full_rescan=False):
         print("[PatchPlanGenerator] === PHASE 1: Patch Identification & Risk Assessment ===")
         print("[PatchPlanGenerator] Step 1: Get raw CVEs and vendor notes")
-        patch_inputs = self.planner.run()
+        patch_inputs = self.planner.run(stream=True, delta=self.delta_ingestion, full_rescan=full_rescan)
 
         print("[PatchPlanGenerator] Step 2: Index vendor notes in Chroma")
         self.rag.ingest_documents()
 
         print("[PatchPlanGenerator] Step 3: Assess risk with LLM explanations")
-        patch_risks = self.assessor.assess_all(patch_inputs["cves"])
+        patch_risks = []
+        failed_assessments = []
+        for result in self.assessor.assess_stream(patch_inputs["cves"]):
+            # A CVE that could not be scored has no risk_score and must not be scheduled as low risk
+            if "error" in result and "risk_score" not in result:
+                failed_assessments.append({"cve_id": result.get("cve_id"), "error": result["error"]})
+            else:
+                patch_risks.append(result)
+        if failed_assessments:
+            print(f"[PatchPlanGenerator] ⚠️ {len(failed_assessments)} CVEs could not be assessed and were not scheduled")
 
         # Attach RAG results (optional)
         vendor_summary = self.rag.query("Summarize all vendor patch priorities")
@@ -61,6 +77,8 @@ class PatchPlanGenerator:
         final_patch_plan["vendor_summary"] = vendor_summary
         final_patch_plan["phase_1_results"] = {
             "patch_risks": patch_risks,
+            "failed_assessments": failed_assessments,
+            "assessment_stats": self.assessor.last_run_stats,
             "vendor_policies": patch_inputs["vendor_policies"]
         }
         
@@ -108,4 +126,12 @@ class PatchPlanGenerator:
             final_patch_plan["execution_report"] = execution_report
             self.audit_logger.log_patch_execution(execution_report)
             
+        if self.delta_ingestion:
+            # Only now is the delta safely planned; a failure above leaves it to be retried next run,
+            # and CVEs that failed assessment or LLM reasoning are retried on their own
+            failed_ids = [failed["cve_id"] for failed in failed_assessments]
+            failed_ids += [risk.get("cve_id") for risk in patch_risks
+                           if risk.get("llm_reasoning", "").startswith("[LLM Error]")]
+            self.planner.commit_watermark(failed_ids=failed_ids)
+            print(f"[PatchPlanGenerator] Ingestion watermark advanced: {self.planner.watermark.summary()}")
         return final_patch_plan
\ No newline at end of file
@@ -0,0 +1,83 @@
+# backend/routers/cve_router.py
+
+from fastapi import APIRouter, HTTPException, Query
+from typing import List, Dict, Any, Optional
+from schemas.cve_schemas import CVEListResponse, CVEStoreStats, CVESyncResponse
+from agents.cve_store import CVEStore
+from agents.patch_planner import PatchPlannerAgent
+
+router = APIRouter(prefix="/api/cves", tags=["cves"])
+
+# Initialize store and planner
+cve_store = CVEStore()
+planner = PatchPlannerAgent(
+    cve_file_path="backend/data/mock_cves.json",
+    vendor_notes_dir="backend/data/vendor_notes",
+    cve_store=cve_store
+)
+
+@router.get("/", response_model=CVEListResponse)
+async def list_cves(
+    severity: Optional[List[str]] = Query(None, description="Severity levels to include"),
+    software: Optional[str] = Query(None, description="Affected software name prefix (case-insensitive)"),
+    vendor: Optional[str] = Query(None, description="Vendor name"),
+    published_after: Optional[str] = Query(None, description="Earliest published date (ISO format)"),
+    published_before: Optional[str] = Query(None, description="Latest published date (ISO format)"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of CVEs to return"),
+    offset: int = Query(0, ge=0, description="Number of matching CVEs to skip")
+):
+    """Query stored CVEs through the store's indexes"""
+    try:
+        filters = {
+            "severity": severity,
+            "software": software,
+            "vendor": vendor,
+            "published_after": published_after,
+            "published_before": published_before
+        }
+        return CVEListResponse(
+            total=cve_store.count(**filters),
+            limit=limit,
+            offset=offset,
+            items=cve_store.query(**filters, limit=limit, offset=offset)
+        )
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to query CVEs: {str(e)}")
+
+@router.get("/stats", response_model=CVEStoreStats)
+async def get_cve_store_stats():
+    """Get counts of stored and indexed CVEs"""
+    try:
+        return CVEStoreStats(**cve_store.stats())
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get CVE store statistics: {str(e)}")
+
+@router.post("/sync", response_model=CVESyncResponse)
+async def sync_cves():
+    """Load the current CVE feed into the store"""
+    try:
+        synced = planner.sync_cve_store()
+        return CVESyncResponse(synced=synced, message=f"Synced {synced} CVEs from {planner.cve_file_path}")
+
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to sync CVEs: {str(e)}")
+
+@router.get("/{cve_id}", response_model=Dict[str, Any])
+async def get_cve(cve_id: str):
+    """Get a single stored CVE record"""
+    try:
+        cve = cve_store.get(cve_id)
+
+        if not cve:
+            raise HTTPException(status_code=404, detail="CVE not found")
+
+        return cve
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get CVE: {str(e)}")
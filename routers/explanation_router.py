@@ -1,7 +1,9 @@
 # backend/routers/explanation_router.py
 
 from fastapi import APIRouter, HTTPException
-from typing import Dict, Any
+from fastapi.responses import StreamingResponse
+from typing import Dict, Any, AsyncIterator
+import json
 from schemas.explanation_schemas import (
     ExplanationRequest, ExplanationResponse, 
     PatchExplanationRequest, PatchExplanationResponse,
@@ -21,7 +23,7 @@ async def generate_patch_plan_explanation(request: ExplanationRequest):
     """Generate comprehensive explanations for a patch plan"""
     try:
         patch_plan = request.patch_plan
-        explanations = explainer_agent.generate_patch_plan_summary(patch_plan)
+        explanations = await explainer_agent.agenerate_patch_plan_summary(patch_plan)
         
         # Log the explanation generation
         audit_logger.log_user_action(
@@ -46,7 +48,7 @@ async def explain_specific_patch(request: PatchExplanationRequest):
     """Generate detailed explanation for a specific patch"""
     try:
         patch = request.patch
-        explanation = explainer_agent.explain_specific_patch(patch)
+        explanation = await explainer_agent.aexplain_specific_patch(patch)
         
         return PatchExplanationResponse(
             cve_id=patch.get("cve_id", "unknown"),
@@ -58,6 +60,53 @@ async def explain_specific_patch(request: PatchExplanationRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to explain patch: {str(e)}")
 
+STREAM_MEDIA_TYPES = {
+    "sse": "text/event-stream",
+    "ndjson": "application/x-ndjson"
+}
+
+def _stream_response(events: AsyncIterator[Dict[str, str]], format: str) -> StreamingResponse:
+    """Serialise explanation events as Server-Sent Events or newline-delimited JSON"""
+    if format not in STREAM_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"Unsupported stream format: {format}")
+    
+    async def body():
+        async for event in events:
+            if format == "sse":
+                yield f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+            else:
+                yield json.dumps(event) + "\n"
+    
+    # X-Accel-Buffering stops reverse proxies from holding back partial output
+    return StreamingResponse(body(), media_type=STREAM_MEDIA_TYPES[format],
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@router.post("/patch-plan/stream")
+async def stream_patch_plan_explanation(request: ExplanationRequest, format: str = "sse"):
+    """Stream patch plan explanations section by section as they are generated"""
+    patch_plan = request.patch_plan
+    
+    async def events():
+        sections = []
+        async for event in explainer_agent.astream_patch_plan_summary(patch_plan):
+            if event["event"] == "section_end":
+                sections.append(event["section"])
+            elif event["event"] == "done":
+                audit_logger.log_user_action(
+                    user_id="system",
+                    action="generate_explanation",
+                    resource_id=patch_plan.get("audit_id", "unknown"),
+                    details={"explanation_types": sections, "streamed": True}
+                )
+            yield event
+    
+    return _stream_response(events(), format)
+
+@router.post("/specific-patch/stream")
+async def stream_specific_patch_explanation(request: PatchExplanationRequest, format: str = "sse"):
+    """Stream the explanation for a specific patch as it is generated"""
+    return _stream_response(explainer_agent.astream_specific_patch(request.patch), format)
+
 @router.get("/templates", response_model=ExplanationTemplatesResponse)
 async def get_explanation_templates():
     """Get available explanation templates and their descriptions"""
@@ -0,0 +1,21 @@
+# backend/schemas/cve_schemas.py
+
+from pydantic import BaseModel, Field
+from typing import Dict, List, Any, Optional
+
+class CVEListResponse(BaseModel):
+    total: int = Field(..., description="Number of CVEs matching the filters")
+    limit: int = Field(..., description="Maximum number of CVEs returned")
+    offset: int = Field(..., description="Number of matching CVEs skipped")
+    items: List[Dict[str, Any]] = Field(..., description="Matching CVE records, newest first")
+
+class CVEStoreStats(BaseModel):
+    total: int = Field(..., description="Total number of stored CVEs")
+    by_severity: Dict[str, int] = Field(..., description="Stored CVEs per severity level")
+    software_entries: int = Field(..., description="Indexed (software, CVE) pairs")
+    vendor_entries: int = Field(..., description="Indexed (vendor, CVE) pairs")
+    latest_published: Optional[str] = Field(None, description="Newest published date in the store")
+
+class CVESyncResponse(BaseModel):
+    synced: int = Field(..., description="Number of CVE records upserted from the feed")
+    message: str = Field(..., description="Result of the sync")
@@ -0,0 +1,66 @@
+# backend/test_cve_feed.py
+
+import gzip
+import io
+import json
+import os
+import tempfile
+from agents.cve_feed import READ_SIZE, _BufferedRecords, iter_cve_records
+
+def sample_records(count: int = 2000):
+    return [{"id": f"CVE-2025-{i:05d}", "severity": "high", "description": f"Issue {i} é \"quoted\"",
+             "affected_software": ["OpenSSH 8.2"], "score": -1.5e-3 * i} for i in range(count)]
+
+def write_feed(name: str, text: str, compress: bool = False) -> str:
+    path = os.path.join(tempfile.mkdtemp(), name)
+    with (gzip.open(path, "wt", encoding="utf-8") if compress else open(path, "w", encoding="utf-8")) as f:
+        f.write(text)
+    return path
+
+def test_json_array():
+    records = sample_records()
+    assert list(iter_cve_records(write_feed("feed.json", json.dumps(records, indent=2)))) == records
+    assert list(iter_cve_records(write_feed("empty.json", " [ ] "))) == []
+
+def test_ndjson():
+    records = sample_records()
+    text = "\n".join(json.dumps(record) for record in records) + "\n\n"
+    assert list(iter_cve_records(write_feed("feed.ndjson", text))) == records
+
+def test_gzip():
+    records = sample_records()
+    assert list(iter_cve_records(write_feed("feed.json.gz", json.dumps(records), compress=True))) == records
+
+def test_records_split_across_reads():
+    # Records several read buffers long, and small records straddling every buffer boundary
+    records = [{"id": "CVE-2025-99999", "description": "x" * (3 * READ_SIZE + 17)}] + sample_records(5000)
+    assert list(iter_cve_records(write_feed("feed.json", json.dumps(records)))) == records
+    for value in [12345678901234567890, -1.25e-7, "é\\\"", None, True]:
+        padding = " " * (READ_SIZE - len(json.dumps(value)) // 2)
+        text = padding + json.dumps([value, value])
+        assert list(iter_cve_records(write_feed("feed.json", text))) == [value, value]
+
+def test_malformed_record_fails_without_reading_the_rest():
+    good = json.dumps(sample_records(20000))
+    for bad in ['{"id": "CVE-2025-1", "severity": }', '{"id": "CVE-2025-1" "severity": "high"}']:
+        stream = io.StringIO("[" + bad + ", " + good[1:])
+        try:
+            list(_BufferedRecords(stream).array_items())
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"Malformed record was accepted: {bad}")
+        assert stream.tell() <= 2 * READ_SIZE, "Parser read ahead looking for the end of a malformed record"
+
+    for text in ['[{"id": "CVE-2025-1"}, {"id": ', '[{"id": "CVE-2025-1"} {"id": "CVE-2025-2"}]', '{"id": "CVE-2025-1"']:
+        try:
+            list(iter_cve_records(write_feed("feed.json", text)))
+        except ValueError:
+            continue
+        raise AssertionError(f"Malformed feed was accepted: {text}")
+
+if __name__ == "__main__":
+    for test in [test_json_array, test_ndjson, test_gzip, test_records_split_across_reads,
+                 test_malformed_record_fails_without_reading_the_rest]:
+        test()
+        print(f"{test.__name__}: ok")
@@ -0,0 +1,46 @@
+# backend/test_cve_watermark.py
+
+import json
+import os
+import tempfile
+from agents.patch_planner import PatchPlannerAgent
+
+def sample_records(count: int = 5):
+    return [{"id": f"CVE-2025-{i:05d}", "severity": "high", "description": f"Issue {i}",
+             "last_modified": "2025-06-01T00:00:00"} for i in range(count)]
+
+def make_planner(records) -> PatchPlannerAgent:
+    directory = tempfile.mkdtemp()
+    cve_path = os.path.join(directory, "cves.json")
+    with open(cve_path, "w") as f:
+        json.dump(records, f)
+    return PatchPlannerAgent(cve_file_path=cve_path, vendor_notes_dir=directory,
+                             watermark_path=os.path.join(directory, "watermark.json"))
+
+def delta_ids(planner: PatchPlannerAgent):
+    return [record["id"] for record in planner.fetch_latest_cves(delta=True)]
+
+def test_unchanged_feed_yields_nothing():
+    records = sample_records()
+    planner = make_planner(records)
+    assert delta_ids(planner) == [record["id"] for record in records]
+    planner.commit_watermark()
+    assert delta_ids(planner) == []
+
+def test_failed_cve_is_retried_on_next_delta_run():
+    records = sample_records()
+    planner = make_planner(records)
+    assert len(delta_ids(planner)) == len(records)
+    planner.commit_watermark(failed_ids=["CVE-2025-00003"])
+
+    # A fresh planner reads the persisted watermark, as the next run would
+    planner = PatchPlannerAgent(cve_file_path=str(planner.cve_file_path), vendor_notes_dir=str(planner.vendor_notes_dir),
+                                watermark_path=str(planner.watermark.path))
+    assert delta_ids(planner) == ["CVE-2025-00003"]
+    planner.commit_watermark()
+    assert delta_ids(planner) == []
+
+if __name__ == "__main__":
+    for test in [test_unchanged_feed_yields_nothing, test_failed_cve_is_retried_on_next_delta_run]:
+        test()
+        print(f"{test.__name__}: ok")
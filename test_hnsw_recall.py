@@ -0,0 +1,73 @@
+# backend/test_hnsw_recall.py
+
+import tempfile
+import time
+import numpy as np
+import pytest
+
+# hnswlib is an optional dependency of the "hnsw" backend
+pytest.importorskip("hnswlib")
+
+from agents.hnsw_index import HNSWBackend
+
+NUM_VECTORS = 20000
+NUM_QUERIES = 200
+DIM = 384
+TOP_K = 10
+EF_VALUES = [16, 32, 64, 128, 256]
+MIN_RECALL_AT_EF_128 = 0.95
+
+def build_corpus(seed: int = 7):
+    rng = np.random.default_rng(seed)
+    # Clustered data is closer to real embeddings than uniform noise
+    centres = rng.normal(size=(50, DIM)).astype(np.float32)
+    vectors = centres[rng.integers(0, 50, NUM_VECTORS)] + 0.3 * rng.normal(size=(NUM_VECTORS, DIM)).astype(np.float32)
+    queries = centres[rng.integers(0, 50, NUM_QUERIES)] + 0.3 * rng.normal(size=(NUM_QUERIES, DIM)).astype(np.float32)
+    return vectors, queries
+
+def exact_top_k(vectors, queries, k):
+    v = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    q = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    return np.argsort(-(q @ v.T), axis=1)[:, :k]
+
+def run_benchmark():
+    vectors, queries = build_corpus()
+    ids = [f"chunk-{i}" for i in range(NUM_VECTORS)]
+    truth = exact_top_k(vectors, queries, TOP_K)
+
+    with tempfile.TemporaryDirectory() as index_dir:
+        backend = HNSWBackend(index_dir)
+        started = time.perf_counter()
+        for start in range(0, NUM_VECTORS, 2000):
+            end = start + 2000
+            backend.upsert(ids[start:end], vectors[start:end], ids[start:end], [{}] * (end - start))
+        backend.persist()
+        build_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        loaded = HNSWBackend(index_dir)
+        load_ms = (time.perf_counter() - started) * 1000
+
+        results = {}
+        for ef in EF_VALUES:
+            loaded.set_ef(ef)
+            started = time.perf_counter()
+            labels = np.vstack([loaded.search_labels(query[None, :], TOP_K) for query in queries])
+            latency_ms = (time.perf_counter() - started) * 1000 / NUM_QUERIES
+            recall = np.mean([len(set(found) & set(expected)) / TOP_K for found, expected in zip(labels, truth)])
+            results[ef] = {"recall": recall, "latency_ms": latency_ms}
+    return build_seconds, load_ms, results
+
+def test_hnsw_recall_against_exact_search():
+    _, _, results = run_benchmark()
+    assert results[128]["recall"] >= MIN_RECALL_AT_EF_128
+
+def main():
+    build_seconds, load_ms, results = run_benchmark()
+    print(f"\n[HNSW Benchmark] {NUM_VECTORS} vectors x {DIM} dims, {NUM_QUERIES} queries")
+    print(f"  Build: {build_seconds:.2f}s, snapshot load: {load_ms:.1f}ms")
+    for ef, result in results.items():
+        print(f"  ef={ef:<4} recall@{TOP_K}={result['recall']:.3f}  latency={result['latency_ms']:.3f}ms/query")
+
+if __name__ == "__main__":
+    main()
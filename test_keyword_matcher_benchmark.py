@@ -0,0 +1,75 @@
+# backend/test_keyword_matcher_benchmark.py
+
+import random
+import time
+from agents.keyword_matcher import KeywordMatcher
+
+KEYWORD_COUNTS = [4, 100, 500, 1000]
+NOTE_COUNT = 50
+NOTE_WORDS = 20000
+SEED = 7
+
+VOCABULARY = ["critical", "high", "reboot", "network", "kernel", "restart", "service", "downtime",
+              "rollback", "security", "update", "openssl", "openssh", "apache", "nginx", "database",
+              "maintenance", "window", "patch", "hotfix", "firmware", "driver", "cluster", "failover"]
+
+def synthetic_keywords(count: int, rng: random.Random):
+    keywords = VOCABULARY[:min(count, len(VOCABULARY))]
+    while len(keywords) < count:
+        # Compound terms share prefixes with the base vocabulary, the worst case for naive scans
+        keywords.append(f"{rng.choice(VOCABULARY)}-{rng.choice(VOCABULARY)}{len(keywords)}")
+    return keywords
+
+FILLER = ["the", "a", "to", "of", "and", "is", "in", "for", "this", "that", "with", "be", "are", "on",
+          "as", "it", "by", "from", "will", "or", "may", "after", "before", "please", "apply", "system",
+          "version", "users", "affected", "install", "configuration", "recommended", "release", "fixed"]
+
+def synthetic_notes(rng: random.Random, keyword_share: float = 0.05):
+    # Bulletin-like prose: mostly filler words with a sprinkling of (sometimes capitalised) policy terms
+    def word():
+        if rng.random() < keyword_share:
+            term = rng.choice(VOCABULARY)
+            return term.capitalize() if rng.random() < 0.2 else term
+        return rng.choice(FILLER)
+    return [" ".join(word() for _ in range(NOTE_WORDS)) for _ in range(NOTE_COUNT)]
+
+def naive_matches(keywords, note):
+    # The implementation PatchPlannerAgent.extract_relevant_policy_terms used before KeywordMatcher
+    return [kw for kw in keywords if kw in note.lower()]
+
+def test_matcher_agrees_with_substring_scan():
+    rng = random.Random(SEED)
+    notes = synthetic_notes(rng)[:5]
+    for count in KEYWORD_COUNTS:
+        keywords = synthetic_keywords(count, rng)
+        matcher = KeywordMatcher(keywords)
+        for note in notes:
+            assert matcher.find(note) == naive_matches(keywords, note)
+
+def main():
+    rng = random.Random(SEED)
+    notes = synthetic_notes(rng)
+    megabytes = sum(len(note) for note in notes) / 1e6
+    print(f"\n[Keyword Matcher Benchmark] {NOTE_COUNT} notes, {megabytes:.1f} MB of text")
+    for count in KEYWORD_COUNTS:
+        keywords = synthetic_keywords(count, rng)
+
+        started = time.perf_counter()
+        expected = [naive_matches(keywords, note) for note in notes]
+        naive_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        matcher = KeywordMatcher(keywords)
+        compile_ms = (time.perf_counter() - started) * 1000
+        started = time.perf_counter()
+        found = [matcher.find(note) for note in notes]
+        matcher_seconds = time.perf_counter() - started
+
+        assert found == expected, "KeywordMatcher disagrees with the substring scan"
+        assert [matcher.find(note) for note in notes[:3]] == [list(matcher.positions(note)) for note in notes[:3]]
+        print(f"  {count:>4} keywords  naive: {naive_seconds * 1000:>8.1f}ms  "
+              f"matcher: {matcher_seconds * 1000:>8.1f}ms (+{compile_ms:.1f}ms compile)  "
+              f"speed-up: {naive_seconds / matcher_seconds:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# backend/test_risk_rules_benchmark.py
+
+import json
+import random
+import time
+from agents.risk_assessor import RiskAssessorAgent
+from agents.risk_rules import DEFAULT_RULES, RiskRuleEngine
+
+SHIPPED_RULES_FILE = "data/risk_rules.json"
+# The shipped file has no rules; benchmark the example rules so there is something to evaluate
+RULES_FILE = "data/risk_rules.example.json"
+FEED_SIZES = [10000, 100000]
+SEED = 42
+
+SOFTWARE = ["OpenSSH 8.2", "Apache HTTP Server 2.4.54", "nginx 1.24", "Ubuntu 22.04", "Debian 11",
+            "PostgreSQL 15", "Windows Server 2019", "OpenSSL 3.0.7", "Redis 7.0", "Jenkins 2.401"]
+PHRASES = ["allows remote code execution", "leads to denial of service", "permits privilege escalation",
+           "is actively exploited in the wild", "exposes sensitive information", "causes memory corruption"]
+
+def synthetic_feed(n: int, seed: int = 7):
+    rng = random.Random(seed)
+    feed = []
+    for i in range(n):
+        cve = {
+            "id": f"CVE-2024-{i:06d}",
+            "severity": rng.choice(["critical", "high", "medium", "low", "unknown"]),
+            "description": f"A flaw in {rng.choice(SOFTWARE)} {rng.choice(PHRASES)} via crafted input {i}.",
+            "affected_software": rng.sample(SOFTWARE, rng.randint(1, 3)),
+            "exposure": rng.choice(["internet", "internal", "public", None])
+        }
+        if rng.random() < 0.3:
+            cve["vendor"] = rng.choice(["microsoft", "cisco", "canonical"])
+        feed.append(cve)
+    return feed
+
+def load_rules(path: str = RULES_FILE):
+    with open(path, "r") as f:
+        return RiskRuleEngine.compile(json.load(f))
+
+def test_shipped_rules_reproduce_default_weights():
+    cves = synthetic_feed(5000)
+    shipped = RiskAssessorAgent(seed=SEED).score_all(cves, load_rules(SHIPPED_RULES_FILE))
+    assert shipped == RiskAssessorAgent(seed=SEED).score_all(cves, RiskRuleEngine.compile(DEFAULT_RULES))
+
+def test_compiled_rules_match_scalar_scoring():
+    rules = load_rules()
+    cves = synthetic_feed(5000)
+    scalar_agent = RiskAssessorAgent(seed=SEED)
+    scalar = [scalar_agent._score(cve, rules) for cve in cves]
+    assert RiskAssessorAgent(seed=SEED).score_all(cves, rules) == scalar
+
+def main():
+    rules = load_rules()
+    print(f"\n[Risk Rule Benchmark] {rules.rule_count} rules over {len(rules.fields)} fields (version {rules.version})")
+    for size in FEED_SIZES:
+        cves = synthetic_feed(size)
+
+        started = time.perf_counter()
+        scalar = [rules.adjustment(cve) for cve in cves]
+        scalar_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        columnar = rules.adjustment_column(cves)
+        columnar_seconds = time.perf_counter() - started
+
+        assert columnar.tolist() == scalar, "columnar rule evaluation differs from the scalar path"
+        evaluations = size * rules.rule_count
+        print(f"  {size:>7} CVEs  scalar: {evaluations / scalar_seconds:>12,.0f} rules/sec"
+              f"  columnar: {evaluations / columnar_seconds:>12,.0f} rules/sec")
+
+if __name__ == "__main__":
+    main()